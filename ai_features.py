@@ -1,9 +1,15 @@
 import cv2
 import numpy as np
-import tensorflow as tf
 import os
-import time
 from enum import Enum
+from instrumentation import get_registry, timed
+tf = None
+def load_tensorflow():
+    global tf
+    if tf is None:
+        import tensorflow
+        tf = tensorflow
+    return tf
 class StyleTransferModel(Enum):
     VAN_GOGH = "van_gogh"
     PICASSO = "picasso"
@@ -32,10 +38,12 @@ class AIFeatures:
         }
         self.color_history = []
         self.suggested_colors = []
-        self.last_process_time = 0
-        self.process_count = 0
-        self.avg_process_time = 0
     def initialize_tf(self):
+        try:
+            load_tensorflow()
+        except ImportError:
+            print("TensorFlow not available")
+            return False
         try:
             if not tf.__version__:
                 print("TensorFlow not available")
@@ -60,8 +68,8 @@ class AIFeatures:
         x = tf.keras.layers.Conv2D(3, 3, padding='same', activation='sigmoid')(x)
         model = tf.keras.Model(inputs=inputs, outputs=x)
         return model
+    @timed("ai.style_transfer")
     def apply_style_transfer(self, content_image, style_model, strength=1.0):
-        start_time = time.time()
         try:
             if not self.tf_initialized:
                 if not self.initialize_tf():
@@ -82,10 +90,6 @@ class AIFeatures:
             else:
                 stylized_image = self._apply_default_style(content_image, strength)
             stylized_image = (stylized_image * 255).astype(np.uint8)
-            end_time = time.time()
-            self.last_process_time = end_time - start_time
-            self.process_count += 1
-            self.avg_process_time = ((self.process_count - 1) * self.avg_process_time + self.last_process_time) / self.process_count
             return stylized_image
         except Exception as e:
             print(f"Error applying style transfer: {e}")
@@ -314,10 +318,11 @@ class AIFeatures:
             self.initialize_virtual_keyboard()
         return self.virtual_keyboard_visible
     def get_performance_metrics(self):
+        stats = get_registry().get_span_stats("ai.style_transfer")
         return {
-            "last_process_time": self.last_process_time * 1000,
-            "avg_process_time": self.avg_process_time * 1000,
-            "process_count": self.process_count,
+            "last_process_time": stats["last"],
+            "avg_process_time": stats["avg"],
+            "process_count": stats["count"],
             "tf_initialized": self.tf_initialized
         }
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+import threading
+import tracemalloc
+NUMPY_DOMAIN = 389047
+class StageAllocations:
+    def __init__(self):
+        self.calls = 0
+        self.measured_calls = 0
+        self.peak_bytes = 0
+        self.net_bytes = 0
+        self.sampled_calls = 0
+        self.sampled_blocks = 0
+        self.sampled_bytes = 0
+        self.sampled_numpy_blocks = 0
+        self.sampled_numpy_bytes = 0
+class AllocationTracker:
+    def __init__(self, snapshot_interval=30, top_sites=10, nframes=1):
+        self.snapshot_interval = snapshot_interval
+        self.top_sites = top_sites
+        self.nframes = nframes
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.sites = {}
+        self.frames = 0
+        self.sampled_frames = 0
+        self.sampling = False
+        self.started_tracemalloc = False
+        self.filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ]
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+            self.started_tracemalloc = True
+        self.sampling = self.snapshot_interval > 0
+    def stop(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = []
+            self.local.stack = stack
+        return stack
+    def enter(self, name):
+        if not tracemalloc.is_tracing():
+            return
+        stack = self._stack()
+        snapshot = self._take_snapshot() if self.sampling else None
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][2] = max(stack[-1][2], peak)
+        tracemalloc.reset_peak()
+        stack.append([name, current, current, snapshot])
+    def exit(self, name):
+        stack = self._stack()
+        if not stack or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        stage_name, start_bytes, peak_seen, snapshot = stack.pop()
+        peak = max(peak, peak_seen)
+        with self.lock:
+            stats = self.stages.get(stage_name)
+            if stats is None:
+                stats = StageAllocations()
+                self.stages[stage_name] = stats
+            stats.calls += 1
+            if snapshot is None:
+                stats.measured_calls += 1
+                stats.peak_bytes += max(0, peak - start_bytes)
+                stats.net_bytes += current - start_bytes
+        if snapshot is not None:
+            self._record_snapshot_diff(stats, snapshot)
+        if stack:
+            stack[-1][2] = max(stack[-1][2], peak)
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
+    def _record_snapshot_diff(self, stats, before):
+        after = self._take_snapshot()
+        blocks = 0
+        size = 0
+        for diff in after.compare_to(before, "lineno"):
+            if diff.count_diff <= 0 and diff.size_diff <= 0:
+                continue
+            blocks += max(0, diff.count_diff)
+            size += max(0, diff.size_diff)
+            frame = diff.traceback[0]
+            key = f"{frame.filename}:{frame.lineno}"
+            with self.lock:
+                site = self.sites.setdefault(key, [0, 0])
+                site[0] += max(0, diff.size_diff)
+                site[1] += max(0, diff.count_diff)
+        numpy_filter = [tracemalloc.DomainFilter(True, NUMPY_DOMAIN)]
+        numpy_blocks = 0
+        numpy_size = 0
+        for diff in after.filter_traces(numpy_filter).compare_to(before.filter_traces(numpy_filter), "lineno"):
+            numpy_blocks += max(0, diff.count_diff)
+            numpy_size += max(0, diff.size_diff)
+        with self.lock:
+            stats.sampled_calls += 1
+            stats.sampled_blocks += blocks
+            stats.sampled_bytes += size
+            stats.sampled_numpy_blocks += numpy_blocks
+            stats.sampled_numpy_bytes += numpy_size
+    def end_frame(self):
+        self.frames += 1
+        if self.snapshot_interval > 0:
+            self.sampling = self.frames % self.snapshot_interval == 0
+            if self.sampling:
+                self.sampled_frames += 1
+    def get_report(self):
+        frames = max(1, self.frames)
+        stages = {}
+        with self.lock:
+            for name, stats in self.stages.items():
+                sampled = max(1, stats.sampled_calls)
+                measured = max(1, stats.measured_calls)
+                calls_per_frame = stats.calls / frames
+                stages[name] = {
+                    "calls": stats.calls,
+                    "peak_bytes_per_frame": stats.peak_bytes / measured * calls_per_frame,
+                    "net_bytes_per_frame": stats.net_bytes / measured * calls_per_frame,
+                    "live_blocks_per_frame": stats.sampled_blocks / sampled * calls_per_frame,
+                    "live_bytes_per_frame": stats.sampled_bytes / sampled * calls_per_frame,
+                    "numpy_blocks_per_frame": stats.sampled_numpy_blocks / sampled * calls_per_frame,
+                    "numpy_bytes_per_frame": stats.sampled_numpy_bytes / sampled * calls_per_frame
+                }
+            sites = sorted(self.sites.items(), key=lambda item: -item[1][0])[:self.top_sites]
+        return {
+            "frames": self.frames,
+            "sampled_frames": self.sampled_frames,
+            "stages": stages,
+            "top_sites": [{"site": site, "bytes": size, "blocks": count} for site, (size, count) in sites]
+        }
+    def print_report(self):
+        report = self.get_report()
+        print(f"Allocations over {report['frames']} frames ({report['sampled_frames']} sampled with snapshots)")
+        print(f"{'stage':<20}{'peak KB/f':>12}{'net KB/f':>12}{'blocks/f':>10}{'numpy/f':>10}{'numpy KB/f':>12}")
+        for name, stats in report["stages"].items():
+            print(f"{name:<20}{stats['peak_bytes_per_frame'] / 1024:>12.1f}{stats['net_bytes_per_frame'] / 1024:>12.1f}"
+                  f"{stats['live_blocks_per_frame']:>10.1f}{stats['numpy_blocks_per_frame']:>10.1f}"
+                  f"{stats['numpy_bytes_per_frame'] / 1024:>12.1f}")
+        if report["top_sites"]:
+            print("Top allocation sites:")
+            for site in report["top_sites"]:
+                print(f"  {site['bytes'] / 1024:>10.1f} KB {site['blocks']:>6} blocks  {site['site']}")
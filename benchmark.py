@@ -0,0 +1,199 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+from clock import SimulatedClock
+from frame_io import BlankSource, NullSink
+from hand_tracking import HandTracker
+from landmark_recording import LandmarkRecorder
+from main import GestureArtApp
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+DEFAULT_FIXTURE_DIR = os.path.join("output", "benchmarks", "fixtures")
+DEFAULT_THRESHOLDS = {
+    "fps_drop": 0.15,
+    "p95_increase": 0.25,
+    "p99_increase": 0.5,
+    "min_ms": 0.05
+}
+FINGERS = {
+    "none": [0, 0, 0, 0, 0],
+    "draw": [0, 1, 0, 0, 0],
+    "select": [0, 1, 1, 0, 0],
+    "clear": [1, 1, 1, 1, 1],
+    "color_pick": [0, 1, 0, 0, 1],
+    "tool_change": [0, 0, 0, 1, 1],
+    "text_input": [0, 1, 1, 1, 0]
+}
+def synthetic_hand(tip, fingers, scale=40.0):
+    tx, ty = tip
+    points = [(0, 2.0), (-0.5, 1.7), (-0.8, 1.4), (-1.0, 1.1), (-0.7, 0.9) if fingers[0] else (-1.3, 1.0)]
+    for finger in range(4):
+        offset = finger * 0.35
+        up = fingers[finger + 1]
+        points.extend([(offset, 1.2), (offset, 0.8), (offset, 0.4 if up else 1.0), (offset, 0.0 if up else 1.1)])
+    return [(tx + x * scale, ty + y * scale, 0.0) for x, y in points]
+def long_strokes(frames, width, height, rng):
+    session = []
+    stroke_length = 90
+    for i in range(frames):
+        phase = i % (stroke_length + 10)
+        if phase >= stroke_length:
+            session.append([synthetic_hand((width / 2, height / 2), FINGERS["none"])])
+            continue
+        t = phase / stroke_length
+        stroke = i // (stroke_length + 10)
+        x = width * (0.15 + 0.7 * t)
+        y = height * (0.3 + 0.4 * ((stroke % 3) / 2)) + 40 * math.sin(t * 6 * math.pi) + rng.normal(0, 1.5)
+        session.append([synthetic_hand((x, y), FINGERS["draw"])])
+    return session
+def gesture_switching(frames, width, height, rng):
+    session = []
+    cycle = ["draw", "draw", "none", "select", "tool_change", "none", "color_pick", "text_input", "none", "clear"]
+    hold = 6
+    for i in range(frames):
+        gesture = cycle[(i // hold) % len(cycle)]
+        x = width * 0.5 + 200 * math.cos(i / 15) + rng.normal(0, 2)
+        y = height * 0.6 + 120 * math.sin(i / 11) + rng.normal(0, 2)
+        session.append([synthetic_hand((x, y), FINGERS[gesture])])
+    return session
+def ui_interaction(frames, width, height, rng):
+    session = []
+    targets = [(320, 30), (80, 100), (130, 100), (180, 150), (320, 30), (410, 30), (150, 200), (410, 30), (590, 30), (590, 30), (145, 30), (230, 30)]
+    dwell = 12
+    for i in range(frames):
+        target = targets[(i // dwell) % len(targets)]
+        step = i % dwell
+        gesture = "select" if step in (dwell // 2, dwell // 2 + 1) else "draw" if step < 2 else "none"
+        x = target[0] + rng.normal(0, 1.0)
+        y = target[1] + rng.normal(0, 1.0)
+        session.append([synthetic_hand((x, y), FINGERS[gesture])])
+    return session
+SCENARIOS = {
+    "long_strokes": long_strokes,
+    "gesture_switching": gesture_switching,
+    "ui_interaction": ui_interaction
+}
+def write_fixture(path, session, width, height, fps=30.0):
+    recorder = LandmarkRecorder(path, max_hands=2, frame_size=(width, height), metadata={"generator": "benchmark"})
+    for i, hands in enumerate(session):
+        recorder.record_frame(i / fps, hands, ["Right"] * len(hands))
+    recorder.close()
+    return path
+def ensure_fixtures(fixture_dir, frames, width, height, seed=7, regenerate=False):
+    paths = {}
+    for index, (name, generator) in enumerate(SCENARIOS.items()):
+        path = os.path.join(fixture_dir, f"{name}_{frames}_{width}x{height}.galm")
+        if regenerate or not os.path.exists(path):
+            rng = np.random.default_rng(seed + index)
+            write_fixture(path, generator(frames, width, height, rng), width, height)
+        paths[name] = path
+    return paths
+def run_scenario(path, width, height, frames, render=True):
+    clock = SimulatedClock()
+    source = BlankSource(width, height, frame_count=frames, color=(90, 110, 130))
+    app = GestureArtApp(width=width, height=height, source=source, sink=NullSink(), mirror=False,
+                        tracker=HandTracker(enable_inference=False, clock=clock), clock=clock, idle_timeout=0)
+    start_time = time.perf_counter()
+    stages = app.replay_landmarks(path, render=render)
+    elapsed = time.perf_counter() - start_time
+    return {
+        "frames": app.frames_processed,
+        "fps": app.frames_processed / elapsed if elapsed > 0 else 0,
+        "stages": {name: {key: stats[key] for key in ("frames", "avg_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")}
+                   for name, stats in stages.items()}
+    }
+def run_benchmarks(frames=600, width=1280, height=720, repeat=3, fixture_dir=DEFAULT_FIXTURE_DIR, regenerate=False, scenarios=None):
+    fixtures = ensure_fixtures(fixture_dir, frames, width, height, regenerate=regenerate)
+    results = {}
+    for name, path in fixtures.items():
+        if scenarios and name not in scenarios:
+            continue
+        runs = [run_scenario(path, width, height, frames) for _ in range(repeat)]
+        best = max(runs, key=lambda run: run["fps"])
+        results[name] = best
+        print(f"{name}: {best['fps']:.1f} fps over {best['frames']} frames (best of {repeat})")
+        print(f"  {'stage':<20}{'avg ms':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}")
+        for stage, stats in best["stages"].items():
+            print(f"  {stage:<20}{stats['avg_ms']:>10.3f}{stats['p50_ms']:>8.3f}{stats['p95_ms']:>8.3f}"
+                  f"{stats['p99_ms']:>8.3f}{stats['max_ms']:>8.3f}")
+    return results
+def compare_to_baseline(results, baseline, thresholds):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if reference is None:
+            continue
+        if reference["fps"] > 0 and result["fps"] < reference["fps"] * (1 - thresholds["fps_drop"]):
+            regressions.append(f"{name}: fps {result['fps']:.1f} < baseline {reference['fps']:.1f}")
+        for stage, stats in result["stages"].items():
+            base = reference["stages"].get(stage)
+            if base is None:
+                continue
+            for key, limit in (("p95_ms", thresholds["p95_increase"]), ("p99_ms", thresholds["p99_increase"])):
+                allowed = max(base[key] * (1 + limit), base[key] + thresholds["min_ms"])
+                if stats[key] > allowed:
+                    regressions.append(f"{name}/{stage}: {key} {stats[key]:.3f} > allowed {allowed:.3f} (baseline {base[key]:.3f})")
+    return regressions
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+def save_baseline(path, results, thresholds, settings):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "settings": settings, "thresholds": thresholds, "scenarios": results}, f, indent=2)
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="GestureArt end-to-end pipeline benchmark")
+    parser.add_argument("--frames", type=int, default=600, help="Frames per scenario")
+    parser.add_argument("--width", type=int, default=1280, help="Canvas width")
+    parser.add_argument("--height", type=int, default=720, help="Canvas height")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the best is reported")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Run only this scenario (repeatable)")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="Directory for landmark fixtures")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate landmark fixtures")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--fps-drop", type=float, help="Allowed relative FPS drop")
+    parser.add_argument("--p95-increase", type=float, help="Allowed relative p95 increase per stage")
+    parser.add_argument("--p99-increase", type=float, help="Allowed relative p99 increase per stage")
+    return parser.parse_args(argv)
+def main(argv=None):
+    args = parse_arguments(argv)
+    results = run_benchmarks(args.frames, args.width, args.height, args.repeat, args.fixtures, args.regenerate, args.scenario)
+    settings = {"frames": args.frames, "width": args.width, "height": args.height, "repeat": args.repeat}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": settings, "scenarios": results}, f, indent=2)
+    baseline = load_baseline(args.baseline)
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if baseline is not None:
+        thresholds.update(baseline.get("thresholds", {}))
+    for key in ("fps_drop", "p95_increase", "p99_increase"):
+        if getattr(args, key) is not None:
+            thresholds[key] = getattr(args, key)
+    if args.update_baseline:
+        save_baseline(args.baseline, results, thresholds, settings)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    if baseline.get("settings") and baseline["settings"] != settings:
+        print(f"Warning: baseline settings {baseline['settings']} differ from this run {settings}")
+    regressions = compare_to_baseline(results, baseline, thresholds)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+from canvas_engine import CanvasEngine, BrushType
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "brush_baseline.json")
+SIZES = [5, 15, 40]
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+SPEEDS = {"slow": 3, "medium": 12, "fast": 40}
+DEFAULT_THRESHOLDS = {
+    "dabs_per_sec_drop": 0.2,
+    "segment_increase": 0.25,
+    "bytes_increase": 0.1,
+    "min_bytes": 1024
+}
+def _stroke_points(width, height, step, count):
+    points = []
+    x, y = width * 0.1, height * 0.5
+    direction = 1
+    for i in range(count):
+        points.append((int(x), int(y + (i % 7) - 3)))
+        x += step * direction
+        if x > width * 0.9 or x < width * 0.1:
+            direction = -direction
+            y = height * 0.25 + (y + height * 0.1) % (height * 0.5)
+    return points
+def measure_dabs(engine, width, height, time_budget, max_dabs):
+    points = _stroke_points(width, height, 17, max_dabs)
+    times = []
+    start_time = time.perf_counter()
+    while len(times) < max_dabs:
+        engine.prev_point = None
+        dab_start = time.perf_counter()
+        engine.draw(points[len(times)], is_drawing=True)
+        times.append(time.perf_counter() - dab_start)
+        if time.perf_counter() - start_time > time_budget and len(times) >= 3:
+            break
+    median = float(np.median(times))
+    return 1.0 / median if median > 0 else 0.0
+def measure_segments(engine, width, height, step, time_budget, max_segments):
+    points = _stroke_points(width, height, step, max_segments + 1)
+    engine.prev_point = None
+    engine.draw(points[0], is_drawing=True)
+    times = []
+    start_time = time.perf_counter()
+    while len(times) < max_segments:
+        segment_start = time.perf_counter()
+        engine.draw(points[len(times) + 1], is_drawing=True)
+        times.append(time.perf_counter() - segment_start)
+        if time.perf_counter() - start_time > time_budget and len(times) >= 3:
+            break
+    engine.prev_point = None
+    return float(np.median(times)) * 1e6
+def measure_allocations(engine, width, height, step, samples=3):
+    points = _stroke_points(width, height, step, samples + 1)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    engine.prev_point = None
+    engine.draw(points[0], is_drawing=True)
+    total = 0
+    for point in points[1:]:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        engine.draw(point, is_drawing=True)
+        total += max(0, tracemalloc.get_traced_memory()[1] - current)
+    engine.prev_point = None
+    if not tracing:
+        tracemalloc.stop()
+    return total / samples
+def run_brush_benchmarks(brushes=None, sizes=SIZES, resolutions=RESOLUTIONS, speeds=SPEEDS, time_budget=0.2, max_iterations=200):
+    results = {}
+    for brush in brushes or list(BrushType):
+        for width, height in resolutions:
+            engine = CanvasEngine(width, height)
+            engine.set_brush(brush)
+            for size in sizes:
+                engine.set_brush_size(size)
+                engine.clear()
+                dabs_per_sec = measure_dabs(engine, width, height, time_budget, max_iterations)
+                for speed, step in speeds.items():
+                    key = f"{brush.name.lower()}/{width}x{height}/size{size}/{speed}"
+                    us_per_segment = measure_segments(engine, width, height, step, time_budget, max_iterations)
+                    bytes_per_segment = measure_allocations(engine, width, height, step)
+                    results[key] = {
+                        "brush": brush.name,
+                        "resolution": [width, height],
+                        "size": size,
+                        "speed": speed,
+                        "dabs_per_sec": dabs_per_sec,
+                        "us_per_segment": us_per_segment,
+                        "bytes_per_segment": bytes_per_segment
+                    }
+                    print(f"{key:<40}{dabs_per_sec:>12.0f} dabs/s{us_per_segment:>12.1f} us/seg{bytes_per_segment / 1024:>12.1f} KB/seg")
+    return results
+def compare_to_baseline(results, baseline, thresholds):
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            continue
+        if result["dabs_per_sec"] < reference["dabs_per_sec"] * (1 - thresholds["dabs_per_sec_drop"]):
+            regressions.append(f"{key}: {result['dabs_per_sec']:.0f} dabs/s < baseline {reference['dabs_per_sec']:.0f}")
+        if result["us_per_segment"] > reference["us_per_segment"] * (1 + thresholds["segment_increase"]):
+            regressions.append(f"{key}: {result['us_per_segment']:.1f} us/segment > baseline {reference['us_per_segment']:.1f}")
+        allowed_bytes = max(reference["bytes_per_segment"] * (1 + thresholds["bytes_increase"]),
+                            reference["bytes_per_segment"] + thresholds["min_bytes"])
+        if result["bytes_per_segment"] > allowed_bytes:
+            regressions.append(f"{key}: {result['bytes_per_segment']:.0f} bytes/segment > baseline {reference['bytes_per_segment']:.0f}")
+    return regressions
+def parse_size(value):
+    width, height = value.lower().split("x")
+    return (int(width), int(height))
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="CanvasEngine brush microbenchmark")
+    parser.add_argument("--brush", action="append", choices=[brush.name.lower() for brush in BrushType], help="Benchmark only this brush (repeatable)")
+    parser.add_argument("--size", type=int, action="append", help="Brush size to benchmark (repeatable)")
+    parser.add_argument("--resolution", type=parse_size, action="append", help="Canvas resolution as WIDTHxHEIGHT (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Only benchmark 640x480 with sizes 5 and 40")
+    parser.add_argument("--time-budget", type=float, default=0.2, help="Seconds spent per measurement")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    return parser.parse_args(argv)
+def main(argv=None):
+    args = parse_arguments(argv)
+    brushes = [BrushType[name.upper()] for name in args.brush] if args.brush else None
+    sizes = args.size or ([5, 40] if args.quick else SIZES)
+    resolutions = args.resolution or ([(640, 480)] if args.quick else RESOLUTIONS)
+    results = run_brush_benchmarks(brushes, sizes, resolutions, SPEEDS, args.time_budget)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if baseline is not None:
+        thresholds.update(baseline.get("thresholds", {}))
+    if args.update_baseline:
+        merged = dict(baseline.get("results", {})) if baseline is not None else {}
+        merged.update(results)
+        directory = os.path.dirname(args.baseline)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "thresholds": thresholds, "results": merged}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    regressions = compare_to_baseline(results, baseline, thresholds)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+if __name__ == "__main__":
+    sys.exit(main())
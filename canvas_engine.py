@@ -1,8 +1,8 @@
 import cv2
 import numpy as np
 import os
-import time
 from enum import Enum
+from instrumentation import get_registry, timed
 class BrushType(Enum):
     STANDARD = 0
     AIRBRUSH = 1
@@ -33,17 +33,19 @@ class CanvasEngine:
         self.layers = [self.canvas.copy()]
         self.active_layer = 0
         self._save_state()
-        self.last_draw_time = 0
-        self.draw_count = 0
-        self.avg_draw_time = 0
+        self.revision = 0
+        self.fast_brushes = False
+        self.ink_tile = 32
+        self.ink_mask = np.zeros(((height + self.ink_tile - 1) // self.ink_tile, (width + self.ink_tile - 1) // self.ink_tile), dtype=bool)
+    @timed("canvas.draw")
     def draw(self, point, pressure=1.0, is_drawing=True):
-        start_time = time.time()
         if point is None:
             self.prev_point = None
             return
         x, y = point
         x = max(0, min(x, self.width - 1))
         y = max(0, min(y, self.height - 1))
+        self.revision += 1
         effective_size = int(self.brush_size * pressure)
         if effective_size < 1:
             effective_size = 1
@@ -66,18 +68,18 @@ class CanvasEngine:
             self._draw_pixel(canvas, (x, y), effective_size)
         else:
             self._draw_standard_brush(canvas, (x, y), effective_size)
+        margin = effective_size * 3 + 1
+        dirty = (x - margin, y - margin, x + margin, y + margin)
         if self.prev_point is not None and is_drawing:
             self._connect_points(canvas, self.prev_point, (x, y), effective_size)
+            px, py = self.prev_point
+            dirty = (min(dirty[0], px - margin), min(dirty[1], py - margin), max(dirty[2], px + margin), max(dirty[3], py + margin))
+        self._update_ink(*dirty)
         if is_drawing:
             self.prev_point = (x, y)
         else:
             self.prev_point = None
             self._save_state()
-        end_time = time.time()
-        draw_time = end_time - start_time
-        self.last_draw_time = draw_time
-        self.draw_count += 1
-        self.avg_draw_time = ((self.draw_count - 1) * self.avg_draw_time + draw_time) / self.draw_count
     def _draw_standard_brush(self, canvas, point, size):
         x, y = point
         cv2.circle(canvas, (x, y), size, self.color, -1)
@@ -149,6 +151,9 @@ class CanvasEngine:
                 0
             )   
     def _draw_watercolor(self, canvas, point, size):
+        if self.fast_brushes and self.prev_point is not None:
+            self._draw_fast_watercolor(canvas, point, size)
+            return
         x, y = point
         temp = np.zeros_like(canvas)
         for i in range(5):
@@ -170,7 +175,23 @@ class CanvasEngine:
                 alpha, 
                 0
             )
+    def _draw_fast_watercolor(self, canvas, point, size):
+        x, y = point
+        y_min = max(0, y - size)
+        y_max = min(self.height, y + size)
+        x_min = max(0, x - size)
+        x_max = min(self.width, x + size)
+        if y_min >= y_max or x_min >= x_max:
+            return
+        region = canvas[y_min:y_max, x_min:x_max]
+        temp = region.copy()
+        cv2.circle(temp, (x - x_min, y - y_min), size, self.color, -1)
+        alpha = self.opacity * 0.35
+        cv2.addWeighted(region, 1 - alpha, temp, alpha, 0, dst=region)
     def _draw_neon(self, canvas, point, size):
+        if self.fast_brushes and self.prev_point is not None:
+            self._draw_fast_neon(canvas, point, size)
+            return
         x, y = point
         temp = np.zeros_like(canvas)
         for i in range(3):
@@ -192,6 +213,12 @@ class CanvasEngine:
                 alpha, 
                 0
             )
+    def _draw_fast_neon(self, canvas, point, size):
+        x, y = point
+        glow = tuple([min(255, c + 50) for c in self.color])
+        core = tuple([min(255, c + 150) for c in self.color])
+        cv2.circle(canvas, (x, y), size, glow, -1)
+        cv2.circle(canvas, (x, y), max(1, size // 3), core, -1)
     def _draw_pixel(self, canvas, point, size):
         x, y = point
         pixel_size = max(1, size // 3)
@@ -231,6 +258,25 @@ class CanvasEngine:
                 self._draw_pixel(canvas, (x, y), size)
             else:
                 self._draw_standard_brush(canvas, (x, y), size)
+    def _update_ink(self, x_min, y_min, x_max, y_max):
+        tile = self.ink_tile
+        tx0 = max(0, x_min) // tile
+        ty0 = max(0, y_min) // tile
+        tx1 = min(self.ink_mask.shape[1], max(0, x_max) // tile + 1)
+        ty1 = min(self.ink_mask.shape[0], max(0, y_max) // tile + 1)
+        if tx0 >= tx1 or ty0 >= ty1:
+            return
+        region = self.layers[self.active_layer][ty0 * tile:ty1 * tile, tx0 * tile:tx1 * tile]
+        inked = np.any(region != np.array(self.background_color, dtype=np.uint8), axis=2)
+        rows = np.arange(0, inked.shape[0], tile)
+        cols = np.arange(0, inked.shape[1], tile)
+        self.ink_mask[ty0:ty1, tx0:tx1] = np.logical_or.reduceat(np.logical_or.reduceat(inked, rows, axis=0), cols, axis=1)
+    def _refresh_ink(self):
+        self._update_ink(0, 0, self.width - 1, self.height - 1)
+    def get_layer(self):
+        return self.layers[self.active_layer]
+    def get_ink_fraction(self):
+        return float(self.ink_mask.mean())
     def set_color(self, color):
         self.color = color
     def set_brush(self, brush_type):
@@ -245,12 +291,16 @@ class CanvasEngine:
         self.hardness = max(0.0, min(1.0, hardness))
     def clear(self):
         self.layers[self.active_layer][:] = self.background_color
+        self.ink_mask[:] = False
+        self.revision += 1
         self._save_state()
     def undo(self):
         if len(self.history) > 1:
             self.redo_stack.append(self.layers[self.active_layer].copy())
             self.history.pop()
             self.layers[self.active_layer] = self.history[-1].copy()
+            self._refresh_ink()
+            self.revision += 1
             if len(self.redo_stack) > self.max_history_size:
                 self.redo_stack.pop(0)
             return True
@@ -262,6 +312,8 @@ class CanvasEngine:
             if len(self.history) > self.max_history_size:
                 self.history.pop(0)
             self.layers[self.active_layer] = state
+            self._refresh_ink()
+            self.revision += 1
             return True
         return False
     def _save_state(self):
@@ -280,10 +332,16 @@ class CanvasEngine:
     def get_transformed_canvas(self):
         return self.layers[self.active_layer].copy()
     def get_performance_metrics(self):
+        stats = get_registry().get_span_stats("canvas.draw")
         return {
-            "last_draw_time": self.last_draw_time * 1000,
-            "avg_draw_time": self.avg_draw_time * 1000,
-            "draw_count": self.draw_count
+            "last_draw_time": stats["last"],
+            "avg_draw_time": stats["avg"],
+            "draw_count": stats["count"],
+            "history_depth": len(self.history),
+            "redo_depth": len(self.redo_stack),
+            "layer_bytes": sum(layer.nbytes for layer in self.layers),
+            "ink_fraction": self.get_ink_fraction(),
+            "history_bytes": sum(state.nbytes for state in self.history) + sum(state.nbytes for state in self.redo_stack)
         }
 if __name__ == "__main__":
     canvas_engine = CanvasEngine(800, 600)
@@ -0,0 +1,34 @@
+import threading
+import time
+class WallClock:
+    def time(self):
+        return time.time()
+    def monotonic(self):
+        return time.monotonic()
+    def perf_counter(self):
+        return time.perf_counter()
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+class SimulatedClock:
+    def __init__(self, start_time=0.0):
+        self.current_time = start_time
+        self.lock = threading.Lock()
+    def time(self):
+        return self.current_time
+    def monotonic(self):
+        return self.current_time
+    def perf_counter(self):
+        return time.perf_counter()
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.advance(seconds)
+    def set_time(self, timestamp):
+        with self.lock:
+            self.current_time = timestamp
+    def advance(self, seconds):
+        with self.lock:
+            self.current_time += seconds
+default_clock = WallClock()
+def get_clock(clock=None):
+    return clock if clock is not None else default_clock
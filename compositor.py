@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+class FrameCompositor:
+    def __init__(self, frame_weight=0.5, canvas_weight=0.5, buffers=2):
+        self.frame_weight = frame_weight
+        self.canvas_weight = canvas_weight
+        self.buffers = max(1, buffers)
+        self.outputs = []
+        self.output_index = 0
+        self.background = None
+        self.background_color = None
+        self.spans = []
+        self.spans_revision = None
+        self.frames = 0
+        self.blended_pixels = 0
+        self.total_pixels = 0
+        self.last_blend_fraction = 0.0
+    def _next_output(self, shape):
+        if not self.outputs or self.outputs[0].shape != shape:
+            self.outputs = [np.empty(shape, dtype=np.uint8) for _ in range(self.buffers)]
+            self.output_index = 0
+        output = self.outputs[self.output_index]
+        self.output_index = (self.output_index + 1) % len(self.outputs)
+        return output
+    def _get_background(self, shape, color):
+        if self.background is None or self.background.shape != shape or self.background_color != color:
+            self.background = np.empty(shape, dtype=np.uint8)
+            self.background[:] = color
+            self.background_color = color
+        return self.background
+    def _ink_spans(self, canvas):
+        if self.spans_revision == canvas.revision:
+            return self.spans
+        tile = canvas.ink_tile
+        spans = []
+        for row in np.flatnonzero(canvas.ink_mask.any(axis=1)):
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], canvas.ink_mask[row].astype(np.int8), [0]))))
+            y0 = int(row) * tile
+            y1 = min(canvas.height, y0 + tile)
+            for start, end in zip(edges[::2], edges[1::2]):
+                x0 = int(start) * tile
+                x1 = min(canvas.width, int(end) * tile)
+                if spans and spans[-1][1] == y0 and spans[-1][2] == x0 and spans[-1][3] == x1:
+                    spans[-1] = (spans[-1][0], y1, x0, x1)
+                else:
+                    spans.append((y0, y1, x0, x1))
+        self.spans = spans
+        self.spans_revision = canvas.revision
+        return spans
+    def compose(self, frame, canvas):
+        output = self._next_output(frame.shape)
+        layer = canvas.get_layer()
+        background = self._get_background(frame.shape, canvas.background_color)
+        cv2.addWeighted(frame, self.frame_weight, background, self.canvas_weight, 0, dst=output)
+        blended = 0
+        for y0, y1, x0, x1 in self._ink_spans(canvas):
+            cv2.addWeighted(frame[y0:y1, x0:x1], self.frame_weight, layer[y0:y1, x0:x1], self.canvas_weight, 0, dst=output[y0:y1, x0:x1])
+            blended += (y1 - y0) * (x1 - x0)
+        pixels = frame.shape[0] * frame.shape[1]
+        self.frames += 1
+        self.blended_pixels += blended
+        self.total_pixels += pixels
+        self.last_blend_fraction = blended / pixels if pixels else 0.0
+        return output
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "last_blend_fraction": self.last_blend_fraction,
+            "avg_blend_fraction": self.blended_pixels / self.total_pixels if self.total_pixels else 0.0,
+            "spans": len(self.spans),
+            "buffer_bytes": sum(output.nbytes for output in self.outputs) + (self.background.nbytes if self.background is not None else 0)
+        }
@@ -0,0 +1,157 @@
+import cv2
+import numpy as np
+import os
+from optimizations import CameraOptimizer
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v")
+class CameraSource:
+    def __init__(self, camera_id=0, width=1280, height=720, **camera_kwargs):
+        self.camera = CameraOptimizer(camera_id, width, height, **camera_kwargs)
+        self.width = width
+        self.height = height
+        self.last_frame_time = 0
+        if not self.camera.initialize():
+            print("Failed to initialize camera")
+    def read(self):
+        ret, frame = self.camera.read_frame()
+        if not ret:
+            return False, None
+        self.last_frame_time = self.camera.last_frame_time
+        return True, frame
+    def get_frame_size(self):
+        return (self.camera.negotiated.get("width", self.width), self.camera.negotiated.get("height", self.height))
+    def get_stats(self):
+        return self.camera.get_stats()
+    def release(self):
+        self.camera.release()
+class VideoFileSource:
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            print(f"Failed to open video: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frames_read = 0
+        self.last_frame_time = 0
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self.frames_read > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if not ret:
+            return False, None
+        self.last_frame_time = self.frames_read / self.fps
+        self.frames_read += 1
+        return True, frame
+    def get_frame_size(self):
+        return (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    def get_stats(self):
+        return {"frames_read": self.frames_read, "frame_count": self.frame_count, "fps": self.fps}
+    def release(self):
+        self.cap.release()
+class ImageSequenceSource:
+    def __init__(self, directory, fps=30.0, loop=False):
+        self.directory = directory
+        self.fps = fps
+        self.loop = loop
+        self.files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.files:
+            print(f"No images found in: {directory}")
+        self.index = 0
+        self.frames_read = 0
+        self.last_frame_time = 0
+    def read(self):
+        if self.index >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.files[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        self.last_frame_time = self.frames_read / self.fps
+        self.frames_read += 1
+        return True, frame
+    def get_frame_size(self):
+        if not self.files:
+            return (0, 0)
+        frame = cv2.imread(self.files[0])
+        return (frame.shape[1], frame.shape[0]) if frame is not None else (0, 0)
+    def get_stats(self):
+        return {"frames_read": self.frames_read, "frame_count": len(self.files)}
+    def release(self):
+        pass
+class BlankSource:
+    def __init__(self, width=1280, height=720, fps=30.0, frame_count=None, color=(40, 40, 40)):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[:] = color
+        self.frames_read = 0
+        self.last_frame_time = 0
+    def read(self):
+        if self.frame_count is not None and self.frames_read >= self.frame_count:
+            return False, None
+        self.last_frame_time = self.frames_read / self.fps
+        self.frames_read += 1
+        return True, self.frame.copy()
+    def get_frame_size(self):
+        return (self.width, self.height)
+    def get_stats(self):
+        return {"frames_read": self.frames_read, "frame_count": self.frame_count}
+    def release(self):
+        pass
+class WindowSink:
+    def __init__(self, window_name="GestureArt", mouse_callback=None):
+        self.window_name = window_name
+        cv2.namedWindow(window_name)
+        if mouse_callback is not None:
+            cv2.setMouseCallback(window_name, mouse_callback)
+    def show(self, frame):
+        cv2.imshow(self.window_name, frame)
+        return cv2.waitKey(1) & 0xFF
+    def close(self):
+        cv2.destroyWindow(self.window_name)
+class NullSink:
+    def __init__(self):
+        self.frames_shown = 0
+    def show(self, frame):
+        self.frames_shown += 1
+        return -1
+    def close(self):
+        pass
+class FileSink:
+    def __init__(self, path, fps=30.0, codec="mp4v"):
+        self.path = path
+        self.fps = fps
+        self.codec = codec
+        self.writer = None
+        self.frames_written = 0
+        self.is_video = path.lower().endswith(VIDEO_EXTENSIONS)
+        target_dir = os.path.dirname(path) if self.is_video else path
+        if target_dir:
+            os.makedirs(target_dir, exist_ok=True)
+    def show(self, frame):
+        if self.is_video:
+            if self.writer is None:
+                self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (frame.shape[1], frame.shape[0]))
+            self.writer.write(frame)
+        else:
+            cv2.imwrite(os.path.join(self.path, f"frame_{self.frames_written:06d}.png"), frame)
+        self.frames_written += 1
+        return -1
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+def open_source(video=None, images=None, camera_id=0, width=1280, height=720):
+    if video:
+        return VideoFileSource(video)
+    if images:
+        return ImageSequenceSource(images)
+    return CameraSource(camera_id, width, height)
@@ -1,7 +1,8 @@
 from enum import Enum
 import cv2
 import numpy as np
-import time
+from clock import get_clock
+from instrumentation import increment, timed
 class GestureType(Enum):
     NONE = 0
     DRAW = 1
@@ -19,8 +20,9 @@ class GestureState(Enum):
     ONGOING = 2
     COMPLETED = 3
 class GestureRecognizer:
-    def __init__(self, detection_threshold=0.8):
+    def __init__(self, detection_threshold=0.8, clock=None):
         self.detection_threshold = detection_threshold
+        self.clock = get_clock(clock)
         self.current_gesture = GestureType.NONE
         self.current_state = GestureState.NONE
         self.current_confidence = 0.0
@@ -31,9 +33,10 @@ class GestureRecognizer:
         self.max_history_size = 10
         self.gesture_cooldown = 0.5
         self.last_gesture_time = 0
+    @timed("gesture.recognize")
     def recognize_gesture(self, landmarks, fingers_up):
-        current_time = time.time()
-        if not landmarks or not fingers_up:
+        current_time = self.clock.time()
+        if landmarks is None or len(landmarks) == 0 or fingers_up is None or len(fingers_up) == 0:
             self._update_state(GestureType.NONE, 0.0, current_time)
             return GestureType.NONE, 0.0, GestureState.NONE
         gesture_type, confidence = self._detect_gesture(landmarks, fingers_up)
@@ -60,7 +63,7 @@ class GestureRecognizer:
             return GestureType.TEXT_INPUT, 0.85
         return GestureType.NONE, 0.0
     def _detect_undo_gesture(self, landmarks):
-        if not landmarks or len(landmarks) < 21:
+        if landmarks is None or len(landmarks) < 21:
             return GestureType.NONE, 0.0
         thumb_tip = landmarks[4]
         index_tip = landmarks[8]
@@ -95,6 +98,7 @@ class GestureRecognizer:
                 self.current_gesture = gesture_type
                 self.current_state = GestureState.STARTED
                 self.gesture_start_time = current_time
+                increment(f"gesture.{gesture_type.name.lower()}")
             elif self.current_gesture == gesture_type:
                 if self.current_state == GestureState.STARTED:
                     self.current_state = GestureState.ONGOING
@@ -102,11 +106,12 @@ class GestureRecognizer:
                 self.current_gesture = gesture_type
                 self.current_state = GestureState.STARTED
                 self.gesture_start_time = current_time
+                increment(f"gesture.{gesture_type.name.lower()}")
     def _add_to_history(self, gesture_type, duration):
         self.gesture_history.append({
             "gesture": gesture_type,
             "duration": duration,
-            "timestamp": time.time()
+            "timestamp": self.clock.time()
         })
         if len(self.gesture_history) > self.max_history_size:
             self.gesture_history.pop(0)
@@ -115,7 +120,7 @@ class GestureRecognizer:
             "gesture": self.current_gesture,
             "state": self.current_state,
             "confidence": self.current_confidence,
-            "duration": time.time() - self.gesture_start_time if self.current_state == GestureState.ONGOING else self.gesture_duration
+            "duration": self.clock.time() - self.gesture_start_time if self.current_state == GestureState.ONGOING else self.gesture_duration
         }
     def reset(self):
         self.current_gesture = GestureType.NONE
@@ -1,31 +1,121 @@
 import cv2
 import numpy as np
 import mediapipe as mp
+import threading
 import time
+from clock import get_clock
+from tracing import trace_span
+from instrumentation import timed
+MIRRORED_HANDEDNESS = {"Left": "Right", "Right": "Left"}
+LANDMARK_IDS = np.arange(21, dtype=np.float32)
+FINGER_TIPS = np.array([8, 12, 16, 20])
+VELOCITY_SMOOTHING = 0.7
+ROI_BUCKET = 32
+MAX_ROI_BUFFERS = 16
+def remap_roi_landmarks(landmarks, roi, w, h):
+    x0, y0, x1, y1 = roi
+    landmarks[..., 0] = (landmarks[..., 0] * (x1 - x0) + x0) / w
+    landmarks[..., 1] = (landmarks[..., 1] * (y1 - y0) + y0) / h
+    landmarks[..., 2] *= (x1 - x0) / w
+    return landmarks
+class CompactHandResults:
+    def __init__(self, landmarks, handedness=None):
+        self.landmarks = landmarks
+        self.handedness = list(handedness) if handedness is not None else []
+        self.multi_hand_landmarks = list(landmarks) if len(landmarks) > 0 else None
 class HandTracker:
-    def __init__(self, static_mode=False, max_hands=2, detection_confidence=0.5, tracking_confidence=0.5):
+    def __init__(self, static_mode=False, max_hands=2, detection_confidence=0.5, tracking_confidence=0.5,
+                 roi_tracking=False, roi_padding=0.4, roi_min_size=160, roi_max_coverage=0.8, inference_size=None,
+                 enable_inference=True, clock=None, background_init=False, warmup_size=(640, 480)):
+        self.clock = get_clock(clock)
         self.static_mode = static_mode
         self.max_hands = max_hands
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=self.static_mode,
-            max_num_hands=self.max_hands,
-            min_detection_confidence=self.detection_confidence,
-            min_tracking_confidence=self.tracking_confidence
-        )
+        self.hands = None
+        self.ready_event = threading.Event()
+        self.init_thread = None
+        self.model_init_time = 0
+        self.warmup_time = 0
+        self.ready_time = None
         self.mp_draw = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
+        self.results = None
         self.prev_landmarks = None
         self.landmark_velocity = np.zeros((21, 2))
-        self.last_update_time = time.time()
-    def find_hands(self, img, draw=True):
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        self.last_update_time = self.clock.time()
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_min_size = roi_min_size
+        self.roi_max_coverage = roi_max_coverage
+        self.roi_landmarks = None
+        self.last_roi = None
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_frame_runs = 0
+        self.roi_buffers = {}
+        self.inference_size = tuple(inference_size) if inference_size else None
+        self.resize_buffer = None
+        self.rgb_buffer = None
+        self.mirror_landmarks = False
+        if not enable_inference:
+            self.ready_event.set()
+        elif background_init:
+            self.init_thread = threading.Thread(target=self._initialize_model, args=(warmup_size,), name="hand-model-init", daemon=True)
+            self.init_thread.start()
+        else:
+            self._initialize_model()
+    def _initialize_model(self, warmup_size=None):
+        start_time = time.perf_counter()
         try:
-            self.results = self.hands.process(img_rgb)
+            hands = self.mp_hands.Hands(
+                static_image_mode=self.static_mode,
+                max_num_hands=self.max_hands,
+                min_detection_confidence=self.detection_confidence,
+                min_tracking_confidence=self.tracking_confidence
+            )
+            self.model_init_time = time.perf_counter() - start_time
+            if warmup_size:
+                warmup_start = time.perf_counter()
+                hands.process(np.zeros((warmup_size[1], warmup_size[0], 3), dtype=np.uint8))
+                self.warmup_time = time.perf_counter() - warmup_start
+            self.hands = hands
         except Exception as e:
-            print(f"Error processing hand image: {e}")
+            print(f"Error initializing hand model: {e}")
+        self.ready_time = time.perf_counter()
+        self.ready_event.set()
+    def is_ready(self):
+        return self.ready_event.is_set()
+    def wait_ready(self, timeout=None):
+        return self.ready_event.wait(timeout)
+    def get_startup_stats(self):
+        return {
+            "ready": self.is_ready(),
+            "model_init_time": self.model_init_time * 1000,
+            "warmup_time": self.warmup_time * 1000
+        }
+    def set_inference_size(self, inference_size):
+        self.inference_size = tuple(inference_size) if inference_size else None
+    def prepare_inference_image(self, img):
+        if self.inference_size is not None and (img.shape[1], img.shape[0]) != self.inference_size:
+            iw, ih = self.inference_size
+            if self.resize_buffer is None or self.resize_buffer.shape[:2] != (ih, iw):
+                self.resize_buffer = np.empty((ih, iw, 3), dtype=np.uint8)
+            cv2.resize(img, (iw, ih), dst=self.resize_buffer, interpolation=cv2.INTER_AREA)
+            img = self.resize_buffer
+        if self.rgb_buffer is None or self.rgb_buffer.shape != img.shape:
+            self.rgb_buffer = np.empty_like(img)
+        self.rgb_buffer.flags.writeable = True
+        with trace_span("color_convert"):
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+        self.rgb_buffer.flags.writeable = False
+        return self.rgb_buffer
+    @timed("hands.find")
+    def find_hands(self, img, draw=True):
+        if self.roi_tracking:
+            return self._find_hands_roi(img, draw)
+        if not self._process(self.prepare_inference_image(img)):
             return img, False
         hands_detected = self.results.multi_hand_landmarks is not None
         if draw and hands_detected:
@@ -38,72 +128,192 @@ class HandTracker:
                     self.mp_drawing_styles.get_default_hand_connections_style()
                 )
         return img, hands_detected
-    def find_positions(self, img, hand_no=0, draw=True):
-        h, w, c = img.shape
-        landmarks = []
-        hand_detected = False
-        if self.results.multi_hand_landmarks:
-            if hand_no < len(self.results.multi_hand_landmarks):
-                hand_landmarks = self.results.multi_hand_landmarks[hand_no]
-                hand_detected = True
-                current_time = time.time()
-                dt = current_time - self.last_update_time if self.prev_landmarks is not None else 0
-                self.last_update_time = current_time
-                for id, lm in enumerate(hand_landmarks.landmark):
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    landmarks.append([id, cx, cy, lm.z])
-                    if draw:
-                        cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
-                if self.prev_landmarks is not None and dt > 0:
-                    for i, landmark in enumerate(landmarks):
-                        if i < len(self.prev_landmarks):
-                            prev_x, prev_y = self.prev_landmarks[i][1], self.prev_landmarks[i][2]
-                            curr_x, curr_y = landmark[1], landmark[2]
-                            vx = (curr_x - prev_x) / dt
-                            vy = (curr_y - prev_y) / dt
-                            alpha = 0.7
-                            self.landmark_velocity[i][0] = alpha * self.landmark_velocity[i][0] + (1 - alpha) * vx
-                            self.landmark_velocity[i][1] = alpha * self.landmark_velocity[i][1] + (1 - alpha) * vy
-                self.prev_landmarks = landmarks.copy()
-        return landmarks, hand_detected
-    def fingers_up(self, landmarks):
-        if not landmarks:
-            return [0, 0, 0, 0, 0]
-        fingers = []
-        if landmarks[4][1] > landmarks[3][1]:
-            fingers.append(1)
-        else:
-            fingers.append(0)
-        for tip_id in [8, 12, 16, 20]:
-            if landmarks[tip_id][2] < landmarks[tip_id - 2][2]:
-                fingers.append(1)
+    def _find_hands_roi(self, img, draw=True):
+        h, w = img.shape[:2]
+        landmarks = None
+        handedness = []
+        roi = self._get_roi(w, h)
+        if roi is not None:
+            roi = self._bucket_roi(roi, w, h)
+        self.last_roi = roi
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            crop_rgb = self._prepare_roi_image(img[y0:y1, x0:x1], w)
+            if self._process(crop_rgb) and self.results.multi_hand_landmarks:
+                landmarks, handedness = self.get_compact_results()
+                remap_roi_landmarks(landmarks, roi, w, h)
+                self.roi_hits += 1
             else:
-                fingers.append(0)
+                self.roi_misses += 1
+        if landmarks is None:
+            self.full_frame_runs += 1
+            if not self._process(self.prepare_inference_image(img)):
+                self.roi_landmarks = None
+                return img, False
+            landmarks, handedness = self.get_compact_results()
+        self.roi_landmarks = landmarks if len(landmarks) > 0 else None
+        return self.apply_compact_results(img, landmarks, handedness, draw)
+    def _roi_scale(self, frame_width):
+        return self.inference_size[0] / frame_width if self.inference_size is not None and self.inference_size[0] < frame_width else 1.0
+    def _bucket_roi(self, roi, w, h):
+        x0, y0, x1, y1 = roi
+        step = ROI_BUCKET / self._roi_scale(w)
+        width = min(w, int(-(-(x1 - x0) // step) * step))
+        height = min(h, int(-(-(y1 - y0) // step) * step))
+        x0 = max(0, min(x0, w - width))
+        y0 = max(0, min(y0, h - height))
+        return (x0, y0, x0 + width, y0 + height)
+    def _prepare_roi_image(self, crop, frame_width):
+        scale = self._roi_scale(frame_width)
+        width = -(-max(1, int(crop.shape[1] * scale)) // ROI_BUCKET) * ROI_BUCKET
+        height = -(-max(1, int(crop.shape[0] * scale)) // ROI_BUCKET) * ROI_BUCKET
+        buffers = self.roi_buffers.get((height, width))
+        if buffers is None:
+            if len(self.roi_buffers) >= MAX_ROI_BUFFERS:
+                self.roi_buffers.clear()
+            buffers = (np.empty((height, width, 3), dtype=np.uint8), np.empty((height, width, 3), dtype=np.uint8))
+            self.roi_buffers[(height, width)] = buffers
+        resized, rgb = buffers
+        cv2.resize(crop, (width, height), dst=resized, interpolation=cv2.INTER_AREA)
+        rgb.flags.writeable = True
+        with trace_span("color_convert"):
+            cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=rgb)
+        rgb.flags.writeable = False
+        return rgb
+    def _process(self, img_rgb):
+        if self.hands is None:
+            self.results = None
+            return False
+        try:
+            with trace_span("hand_process"):
+                self.results = self.hands.process(img_rgb)
+            return True
+        except Exception as e:
+            print(f"Error processing hand image: {e}")
+            self.results = None
+            return False
+    def _get_roi(self, w, h):
+        if self.roi_landmarks is None:
+            return None
+        xs = self.roi_landmarks[..., 0] * w
+        ys = self.roi_landmarks[..., 1] * h
+        x_min, x_max = float(xs.min()), float(xs.max())
+        y_min, y_max = float(ys.min()), float(ys.max())
+        size = max(x_max - x_min, y_max - y_min)
+        size = max(self.roi_min_size, size * (1 + 2 * self.roi_padding))
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(max(0, cx - size / 2))
+        y0 = int(max(0, cy - size / 2))
+        x1 = int(min(w, cx + size / 2))
+        y1 = int(min(h, cy + size / 2))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        if (x1 - x0) * (y1 - y0) > self.roi_max_coverage * w * h:
+            return None
+        return (x0, y0, x1, y1)
+    def get_roi_stats(self):
+        attempts = self.roi_hits + self.roi_misses
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "full_frame_runs": self.full_frame_runs,
+            "roi_hit_rate": self.roi_hits / attempts if attempts else 0,
+            "last_roi": self.last_roi
+        }
+    def get_compact_results(self, display_space=False):
+        if self.results is None or not self.results.multi_hand_landmarks:
+            return np.zeros((0, 21, 3), dtype=np.float32), []
+        if isinstance(self.results, CompactHandResults):
+            landmarks, handedness = self.results.landmarks, self.results.handedness
+        else:
+            landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+                                  for hand_landmarks in self.results.multi_hand_landmarks], dtype=np.float32)
+            handedness = []
+            if getattr(self.results, "multi_handedness", None):
+                handedness = [hand.classification[0].label for hand in self.results.multi_handedness]
+        if display_space and self.mirror_landmarks:
+            landmarks = landmarks.copy()
+            landmarks[..., 0] = 1.0 - landmarks[..., 0]
+            handedness = [MIRRORED_HANDEDNESS.get(label, label) for label in handedness]
+        return landmarks, handedness
+    def apply_compact_results(self, img, landmarks, handedness=None, draw=True):
+        self.results = CompactHandResults(landmarks, handedness)
+        hands_detected = self.results.multi_hand_landmarks is not None
+        if draw and hands_detected:
+            self.draw_compact_landmarks(img, landmarks)
+        return img, hands_detected
+    def draw_compact_landmarks(self, img, landmarks):
+        h, w = img.shape[:2]
+        for hand in landmarks:
+            points = [(int(x * w), int(y * h)) for x, y, _ in hand.tolist()]
+            for start, end in self.mp_hands.HAND_CONNECTIONS:
+                cv2.line(img, points[start], points[end], (255, 255, 255), 2)
+            for point in points:
+                cv2.circle(img, point, 4, (0, 0, 255), cv2.FILLED)
+        return img
+    def find_position_array(self, img, hand_no=0, draw=True, target_size=None):
+        h, w = img.shape[:2]
+        tw, th = target_size if target_size else (w, h)
+        compact, _ = self.get_compact_results()
+        positions = np.empty((len(compact), 21, 4), dtype=np.float32)
+        if hand_no >= len(compact):
+            return positions, False
+        xs = 1.0 - compact[..., 0] if self.mirror_landmarks else compact[..., 0]
+        positions[..., 0] = LANDMARK_IDS
+        np.multiply(xs, tw, out=positions[..., 1])
+        np.multiply(compact[..., 1], th, out=positions[..., 2])
+        positions[..., 3] = compact[..., 2]
+        hand = positions[hand_no, :, 1:3]
+        current_time = self.clock.time()
+        dt = current_time - self.last_update_time if self.prev_landmarks is not None else 0
+        self.last_update_time = current_time
+        if self.prev_landmarks is not None and dt > 0:
+            self.landmark_velocity *= VELOCITY_SMOOTHING
+            self.landmark_velocity += (1 - VELOCITY_SMOOTHING) * (hand - self.prev_landmarks) / dt
+        self.prev_landmarks = hand.copy()
+        if draw:
+            for x, y in (compact[hand_no, :, :2] * (w, h)).astype(np.int32).tolist():
+                cv2.circle(img, (x, y), 5, (255, 0, 255), cv2.FILLED)
+        return positions, True
+    def find_positions(self, img, hand_no=0, draw=True, target_size=None):
+        positions, hand_detected = self.find_position_array(img, hand_no, draw, target_size)
+        if not hand_detected:
+            return [], False
+        return [[id, int(x), int(y), z] for id, (_, x, y, z) in enumerate(positions[hand_no].tolist())], True
+    def fingers_up_array(self, positions):
+        positions = np.asarray(positions, dtype=np.float32)
+        fingers = np.empty(positions.shape[:-2] + (5,), dtype=np.int8)
+        fingers[..., 0] = positions[..., 4, 1] > positions[..., 3, 1]
+        fingers[..., 1:] = positions[..., FINGER_TIPS, 2] < positions[..., FINGER_TIPS - 2, 2]
         return fingers
+    def fingers_up(self, landmarks):
+        if landmarks is None or len(landmarks) == 0:
+            return [0, 0, 0, 0, 0]
+        return self.fingers_up_array(landmarks).tolist()
     def get_landmark_velocity(self, landmark_id):
         if landmark_id < 0 or landmark_id >= 21:
             return (0, 0)
         return tuple(self.landmark_velocity[landmark_id])
+    def get_hand_center_array(self, positions):
+        positions = np.asarray(positions, dtype=np.float32)
+        return (positions[..., 0, 1:3] + positions[..., 9, 1:3]) / 2
     def get_hand_center(self, landmarks):
-        if not landmarks:
+        if landmarks is None or len(landmarks) == 0:
             return None
-        wrist = landmarks[0]
-        middle_mcp = landmarks[9]
-        center_x = (wrist[1] + middle_mcp[1]) // 2
-        center_y = (wrist[2] + middle_mcp[2]) // 2
-        return (center_x, center_y)
+        center = self.get_hand_center_array(landmarks)
+        return (int(center[0]), int(center[1]))
+    def get_hand_size_array(self, positions):
+        positions = np.asarray(positions, dtype=np.float32)
+        return np.hypot(positions[..., 12, 1] - positions[..., 0, 1], positions[..., 12, 2] - positions[..., 0, 2])
     def get_hand_size(self, landmarks):
-        if not landmarks or len(landmarks) < 21:
+        if landmarks is None or len(landmarks) < 21:
             return 0
-        wrist = landmarks[0]
-        middle_tip = landmarks[12]
-        dx = middle_tip[1] - wrist[1]
-        dy = middle_tip[2] - wrist[2]
-        return np.sqrt(dx*dx + dy*dy)
+        return float(self.get_hand_size_array(landmarks))
     def reset(self):
+        self.roi_landmarks = None
         self.prev_landmarks = None
         self.landmark_velocity = np.zeros((21, 2))
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock.time()
 if __name__ == "__main__":
     cap = cv2.VideoCapture(0)
     tracker = HandTracker()
@@ -0,0 +1,181 @@
+import numpy as np
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from multiprocessing import shared_memory
+class SharedFrameRing:
+    def __init__(self, slots, frame_shape, name=None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        nbytes = int(slots * np.prod(self.frame_shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.shm = _attach_shared_memory(name)
+            self.owner = False
+        self.name = self.shm.name
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+    def write(self, slot, frame):
+        h, w = frame.shape[:2]
+        np.copyto(self.frames[slot, :h, :w], frame)
+        return h, w
+    def view(self, slot, h, w):
+        return self.frames[slot, :h, :w]
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+def _inference_worker(shm_name, slots, frame_shape, task_queue, result_queue, tracker_kwargs):
+    from hand_tracking import HandTracker
+    ring = SharedFrameRing(slots, frame_shape, name=shm_name)
+    tracker = HandTracker(**tracker_kwargs)
+    result_queue.put(("ready", os.getpid()))
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, slot, h, w, inference_size = task
+            if inference_size != tracker.inference_size:
+                tracker.set_inference_size(inference_size)
+            img_rgb = tracker.prepare_inference_image(ring.view(slot, h, w))
+            try:
+                tracker.results = tracker.hands.process(img_rgb)
+                landmarks, handedness = tracker.get_compact_results()
+            except Exception as e:
+                print(f"Error processing hand image in worker: {e}")
+                landmarks, handedness = np.zeros((0, 21, 3), dtype=np.float32), []
+            result_queue.put((seq, slot, landmarks, handedness))
+    finally:
+        ring.close()
+class HandInferencePool:
+    def __init__(self, num_workers=2, frame_shape=(720, 1280, 3), slots=None, tracker_kwargs=None,
+                 start_method="spawn", submit_timeout=0.5):
+        self.num_workers = max(1, num_workers)
+        self.slots = slots if slots else self.num_workers * 2
+        self.submit_timeout = submit_timeout
+        self.inference_size = None
+        self.set_inference_size((tracker_kwargs or {}).get("inference_size"))
+        self.ring = SharedFrameRing(self.slots, frame_shape)
+        context = multiprocessing.get_context(start_method)
+        self.task_queue = context.Queue()
+        self.result_queue = context.Queue()
+        self.workers = []
+        for i in range(self.num_workers):
+            worker = context.Process(
+                target=_inference_worker,
+                args=(self.ring.name, self.slots, self.ring.frame_shape, self.task_queue, self.result_queue, tracker_kwargs or {}),
+                name=f"hand-inference-{i}",
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+        self.free_slots = deque(range(self.slots))
+        self.pending = deque()
+        self.completed = {}
+        self.next_seq = 0
+        self.ready_workers = 0
+        self.frames_submitted = 0
+        self.frames_completed = 0
+        self.frames_dropped = 0
+        self.frames_stale = 0
+        self.stale_before = 0
+    def set_inference_size(self, inference_size):
+        self.inference_size = tuple(inference_size) if inference_size else None
+    def submit(self, frame, tag=None):
+        if frame.shape[0] > self.ring.frame_shape[0] or frame.shape[1] > self.ring.frame_shape[1]:
+            raise ValueError(f"Frame {frame.shape} does not fit shared ring slot {self.ring.frame_shape}")
+        if not self.free_slots:
+            deadline = time.monotonic() + self.submit_timeout
+            while not self.free_slots and time.monotonic() < deadline:
+                self._receive(timeout=max(0.0, deadline - time.monotonic()))
+        if not self.free_slots:
+            self.frames_dropped += 1
+            return False
+        slot = self.free_slots.popleft()
+        h, w = self.ring.write(slot, frame)
+        seq = self.next_seq
+        self.next_seq += 1
+        self.pending.append((seq, tag))
+        self.task_queue.put((seq, slot, h, w, self.inference_size))
+        self.frames_submitted += 1
+        return True
+    def _receive(self, timeout=0.0):
+        try:
+            message = self.result_queue.get(timeout=timeout) if timeout > 0 else self.result_queue.get_nowait()
+        except queue.Empty:
+            return False
+        if message[0] == "ready":
+            self.ready_workers += 1
+            return True
+        seq, slot, landmarks, handedness = message
+        self.free_slots.append(slot)
+        self.frames_completed += 1
+        if seq < self.stale_before:
+            self.frames_stale += 1
+        else:
+            self.completed[seq] = (landmarks, handedness)
+        return True
+    def collect(self, timeout=0.0):
+        while self._receive():
+            pass
+        if self.pending and self.pending[0][0] not in self.completed and timeout > 0:
+            deadline = time.monotonic() + timeout
+            while self.pending[0][0] not in self.completed and time.monotonic() < deadline:
+                self._receive(timeout=max(0.0, deadline - time.monotonic()))
+        results = []
+        while self.pending and self.pending[0][0] in self.completed:
+            seq, tag = self.pending.popleft()
+            landmarks, handedness = self.completed.pop(seq)
+            results.append((tag, landmarks, handedness))
+        return results
+    def infer(self, frame, timeout=1.0):
+        seq = self.next_seq
+        if not self.submit(frame):
+            return np.zeros((0, 21, 3), dtype=np.float32), []
+        deadline = time.monotonic() + timeout
+        while seq not in self.completed and time.monotonic() < deadline:
+            self._receive(timeout=max(0.0, deadline - time.monotonic()))
+        result = self.completed.pop(seq, None)
+        self.stale_before = seq + 1
+        while self.pending and self.pending[0][0] <= seq:
+            self.pending.popleft()
+        for stale in [s for s in self.completed if s <= seq]:
+            del self.completed[stale]
+            self.frames_stale += 1
+        if result is None:
+            return np.zeros((0, 21, 3), dtype=np.float32), []
+        return result
+    def in_flight(self):
+        return len(self.pending)
+    def oldest_pending_tag(self):
+        return self.pending[0][1] if self.pending else None
+    def get_stats(self):
+        return {
+            "workers": self.num_workers,
+            "ready_workers": self.ready_workers,
+            "slots": self.slots,
+            "in_flight": len(self.pending),
+            "frames_submitted": self.frames_submitted,
+            "frames_completed": self.frames_completed,
+            "frames_dropped": self.frames_dropped,
+            "frames_stale": self.frames_stale
+        }
+    def close(self):
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        self.ring.close()
@@ -0,0 +1,110 @@
+import functools
+import threading
+from clock import get_clock
+from optimizations import LatencyHistogram
+from tracing import add_span
+class _NullSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+NULL_SPAN = _NullSpan()
+class Span:
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.start = 0
+    def __enter__(self):
+        if self.registry.allocation_tracker is not None:
+            self.registry.allocation_tracker.enter(self.name)
+        self.start = self.registry.clock.perf_counter()
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.record(self.name, self.registry.clock.perf_counter() - self.start, self.start)
+        if self.registry.allocation_tracker is not None:
+            self.registry.allocation_tracker.exit(self.name)
+        return False
+class InstrumentationRegistry:
+    def __init__(self, enabled=True, window=120, clock=None):
+        self.enabled = enabled
+        self.window = window
+        self.clock = get_clock(clock)
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+        self.gauges = {}
+        self.allocation_tracker = None
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    def record(self, name, elapsed, start=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.spans.get(name)
+            if histogram is None:
+                histogram = LatencyHistogram(self.window)
+                self.spans[name] = histogram
+            histogram.record(elapsed)
+        if start is not None:
+            add_span(name, start, start + elapsed)
+    def increment(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    def set_gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+    def get_span_stats(self, name):
+        histogram = self.spans.get(name)
+        if histogram is None:
+            return {"count": 0, "total": 0, "last": 0, "avg": 0}
+        return {
+            "count": histogram.count,
+            "total": histogram.total * 1000,
+            "last": histogram.last * 1000,
+            "avg": histogram.total / histogram.count * 1000 if histogram.count else 0
+        }
+    def snapshot(self):
+        with self.lock:
+            spans = {name: histogram.get_summary() for name, histogram in self.spans.items()}
+            for name, histogram in self.spans.items():
+                spans[name]["total"] = histogram.total * 1000
+            return {
+                "enabled": self.enabled,
+                "spans": spans,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges)
+            }
+    def reset(self):
+        with self.lock:
+            self.spans = {}
+            self.counters = {}
+            self.gauges = {}
+default_registry = InstrumentationRegistry()
+def get_registry():
+    return default_registry
+def set_enabled(enabled):
+    default_registry.enabled = enabled
+def span(name):
+    return default_registry.span(name)
+def timed(name):
+    return default_registry.timed(name)
+def record(name, elapsed, start=None):
+    default_registry.record(name, elapsed, start)
+def increment(name, value=1):
+    default_registry.increment(name, value)
+def set_gauge(name, value):
+    default_registry.set_gauge(name, value)
@@ -0,0 +1,98 @@
+import json
+import os
+import struct
+import numpy as np
+MAGIC = b"GALM"
+VERSION = 1
+HEADER_ALIGNMENT = 64
+HANDEDNESS_CODES = {"Left": 0, "Right": 1}
+HANDEDNESS_LABELS = {0: "Left", 1: "Right"}
+LANDMARK_IDS = np.arange(21, dtype=np.float32)
+def record_dtype(max_hands):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("frame_index", "<i4"),
+        ("hand_count", "<i2"),
+        ("predicted", "<i1"),
+        ("handedness", "<i1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, 21, 3))
+    ])
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=2, frame_size=None, metadata=None):
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "wb")
+        header = {
+            "version": VERSION,
+            "max_hands": max_hands,
+            "frame_size": list(frame_size) if frame_size else None,
+            "record_size": self.dtype.itemsize,
+            "metadata": metadata or {}
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_size = len(MAGIC) + 4 + len(header_bytes)
+        padding = (-header_size) % HEADER_ALIGNMENT
+        self.file.write(MAGIC + struct.pack("<I", len(header_bytes) + padding) + header_bytes + b" " * padding)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.frame_index = 0
+    def record_frame(self, timestamp, hands, handedness=None, predicted=False):
+        record = self.record[0]
+        record["timestamp"] = timestamp
+        record["frame_index"] = self.frame_index
+        hand_count = min(len(hands), self.max_hands)
+        record["hand_count"] = hand_count
+        record["predicted"] = 1 if predicted else 0
+        record["handedness"] = -1
+        record["landmarks"] = 0
+        for i in range(hand_count):
+            record["landmarks"][i] = np.asarray(hands[i], dtype=np.float32)[:21, :3]
+            if handedness and i < len(handedness):
+                record["handedness"][i] = HANDEDNESS_CODES.get(handedness[i], -1)
+        self.file.write(self.record.tobytes())
+        self.frame_index += 1
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+class LandmarkSessionReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"Not a landmark recording: {path}")
+            header_length = struct.unpack("<I", f.read(4))[0]
+            self.header = json.loads(f.read(header_length).decode("utf-8").rstrip())
+        self.max_hands = self.header["max_hands"]
+        self.frame_size = tuple(self.header["frame_size"]) if self.header.get("frame_size") else None
+        self.dtype = record_dtype(self.max_hands)
+        offset = len(MAGIC) + 4 + header_length
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self.timestamps = self.records["timestamp"]
+    def __len__(self):
+        return len(self.records)
+    def get_frame(self, index):
+        record = self.records[index]
+        hand_count = int(record["hand_count"])
+        hands = np.empty((hand_count, 21, 4), dtype=np.float32)
+        hands[..., 0] = LANDMARK_IDS
+        hands[..., 1:] = record["landmarks"][:hand_count]
+        handedness = [HANDEDNESS_LABELS.get(int(code), "") for code in record["handedness"][:hand_count]]
+        return float(record["timestamp"]), hands, handedness, bool(record["predicted"])
+    def index_for_time(self, timestamp):
+        return int(np.searchsorted(self.timestamps, timestamp, side="left"))
+    def get_duration(self):
+        if len(self.records) < 2:
+            return 0
+        return float(self.timestamps[-1] - self.timestamps[0])
+    def close(self):
+        self.records = None
+        self.timestamps = None
@@ -0,0 +1,55 @@
+import json
+import os
+import platform
+import time
+DEFAULT_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "machine_profile.json")
+PROFILE_VERSION = 1
+def recommend_settings(results, target_fps=30.0):
+    frame_budget = 1000.0 / target_fps
+    settings = {"capture_size": None, "inference_size": None, "pipeline": False}
+    camera = [entry for entry in results.get("camera", []) if entry.get("supported")]
+    if camera:
+        fast = [entry for entry in camera if entry["fps"] >= target_fps * 0.8]
+        best = max(fast or camera, key=lambda entry: (entry["width"] * entry["height"] if fast else entry["fps"]))
+        settings["capture_size"] = [best["width"], best["height"]]
+    inference = sorted(results.get("inference", []), key=lambda entry: entry["width"] * entry["height"])
+    if inference:
+        fitting = [entry for entry in inference if entry["p95_ms"] <= frame_budget * 0.5]
+        chosen = fitting[-1] if fitting else inference[0]
+        settings["inference_size"] = [chosen["width"], chosen["height"]]
+        ui_ms = results.get("ui", {}).get("avg_ms", 0)
+        settings["pipeline"] = chosen["avg_ms"] + ui_ms > frame_budget * 0.7
+    return settings
+def save_profile(results, path=DEFAULT_PROFILE_PATH, target_fps=30.0):
+    profile = {
+        "version": PROFILE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count()
+        },
+        "target_fps": target_fps,
+        "results": results,
+        "settings": recommend_settings(results, target_fps)
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    return profile
+def load_profile(path=DEFAULT_PROFILE_PATH):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading machine profile {path}: {e}")
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        print(f"Ignoring machine profile {path}: unsupported version {profile.get('version')}")
+        return None
+    return profile
@@ -1,105 +1,672 @@
-import cv2
 import time
+STARTUP_BEGIN = time.perf_counter()
+import argparse
+import cv2
+import numpy as np
 from hand_tracking import HandTracker
 from gesture_recognition import GestureRecognizer, GestureType, GestureState
 from canvas_engine import CanvasEngine, BrushType
+from compositor import FrameCompositor
+from preprocessing import FramePreprocessor
+from session_recorder import SessionRecorder
 from ui import UIManager, UIElement
+from optimizations import InferenceScheduler, IdleMonitor, SkippedLandmarks, PerformanceOptimizer, QualityGovernor
+from inference_workers import HandInferencePool
+from pipeline import FramePipeline, DROP_OLDEST, DROP_NEWEST, BLOCK
+from frame_io import CameraSource, BlankSource, WindowSink, NullSink, FileSink, open_source
+from landmark_recording import LandmarkRecorder, LandmarkSessionReader
+from clock import SimulatedClock, get_clock
+from tracing import Tracer, trace_span
+from metrics_server import MetricsServer
+from sampling_profiler import SamplingProfiler, install_signal_handler
+from allocation_tracking import AllocationTracker
+from instrumentation import get_registry, set_enabled, span, record, increment
+from startup_timing import StartupTimer
+from machine_profile import DEFAULT_PROFILE_PATH, load_profile
+IMPORTS_DONE = time.perf_counter()
 class GestureArtApp:
-    def __init__(self, cam_id=0, width=1280, height=720):
+    def __init__(self, cam_id=0, width=1280, height=720, pipeline_mode=False, queue_size=2, drop_policy=DROP_OLDEST,
+                 inference_workers=0, inference_interval=1, prediction_error_threshold=25.0,
+                 roi_tracking=False, capture_size=None, inference_size=None, source=None, sink=None, mirror=True,
+                 mirror_landmarks=False, record_landmarks=None, tracker=None, clock=None, idle_timeout=30.0, idle_fps=5.0,
+                 target_fps=None, tracer=None, metrics_server=None, metrics_interval=1.0,
+                 profiler=None, allocation_tracker=None, startup=None, session_recorder=None):
+        if inference_workers > 0 and (roi_tracking or tracker is not None and tracker.roi_tracking):
+            raise ValueError("ROI tracking is not supported with inference workers")
+        if inference_workers > 0 and pipeline_mode and inference_interval > 1:
+            raise ValueError("An inference interval is not supported with pipelined inference workers")
         self.cam_id = cam_id
         self.width = width
         self.height = height
-        self.cap = cv2.VideoCapture(cam_id)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self.tracker = HandTracker()
-        self.recognizer = GestureRecognizer(detection_threshold=0.75)
+        self.capture_size = tuple(capture_size) if capture_size else (width, height)
+        self.inference_size = tuple(inference_size) if inference_size else None
+        self.pipeline_mode = pipeline_mode
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.source = source if source is not None else CameraSource(cam_id, self.capture_size[0], self.capture_size[1])
+        self.sink = sink
+        self.mirror = mirror
+        self.preprocessor = FramePreprocessor(mirror, mirror_landmarks)
+        self.clock = get_clock(clock)
+        self.simulated_time = isinstance(self.clock, SimulatedClock)
+        self.tracker = tracker if tracker is not None else HandTracker(roi_tracking=roi_tracking, inference_size=self.inference_size, clock=self.clock)
+        self.tracker.mirror_landmarks = self.preprocessor.mirror_landmarks
+        self.inference_pool = None
+        if inference_workers > 0:
+            source_width, source_height = self.source.get_frame_size()
+            frame_shape = (source_height or self.capture_size[1], source_width or self.capture_size[0], 3)
+            self.inference_pool = HandInferencePool(inference_workers, frame_shape=frame_shape, tracker_kwargs={
+                "static_mode": self.tracker.static_mode,
+                "max_hands": self.tracker.max_hands,
+                "detection_confidence": self.tracker.detection_confidence,
+                "tracking_confidence": self.tracker.tracking_confidence,
+                "inference_size": self.inference_size
+            })
+        self.recognizer = GestureRecognizer(detection_threshold=0.75, clock=self.clock)
         self.canvas = CanvasEngine(width, height, background_color=(255, 255, 255))
-        self.ui = UIManager(width, height)
+        self.compositor = FrameCompositor()
+        self.ui = UIManager(width, height, clock=self.clock)
+        self.scheduler = None
+        if inference_interval > 1:
+            self.scheduler = InferenceScheduler(inference_interval, prediction_error_threshold, clock=self.clock)
+        self.recorder = None
+        if record_landmarks:
+            self.recorder = LandmarkRecorder(record_landmarks, self.tracker.max_hands, (width, height))
+        self.idle_monitor = None
+        self.idle_packets = []
+        if idle_timeout:
+            self.idle_monitor = IdleMonitor(idle_timeout, idle_fps=idle_fps, clock=self.clock)
+        self.performance = PerformanceOptimizer()
+        self.governor = None
+        if target_fps:
+            self.governor = QualityGovernor(self.performance, target_fps, clock=self.clock)
+        self.tracer = tracer
+        self.metrics_server = metrics_server
+        self.profiler = profiler
+        self.allocation_tracker = allocation_tracker
+        self.session_recorder = session_recorder
+        self.startup = startup
+        self.metrics_interval = metrics_interval
+        self.last_metrics_time = None
+        self.quality_level = 0
+        self.draw_landmarks = True
+        self.last_final_frame = None
+        self.last_composed_revision = -1
+        self.pipeline = None
+        self.display_buffer = None
         self.last_draw_state = False
         self.mouse_point = None
         self.mouse_click = False
+        self.instrumentation = get_registry()
+        self.frames_processed = 0
+        self.run_time = 0
     def run(self):
-        cv2.namedWindow("GestureArt")
-        cv2.setMouseCallback("GestureArt", self.mouse_callback)
+        if self.sink is None:
+            self.sink = WindowSink("GestureArt", self.mouse_callback)
+        self.instrumentation.reset()
+        self._start_allocation_tracking()
+        if self.session_recorder is not None:
+            self.session_recorder.start()
+        start_time = time.perf_counter()
+        try:
+            if self.pipeline_mode:
+                self._run_pipeline()
+            else:
+                self._run_serial()
+        finally:
+            self.run_time = time.perf_counter() - start_time
+            self.source.release()
+            if self.inference_pool is not None:
+                self.inference_pool.close()
+            self.sink.close()
+            if self.session_recorder is not None:
+                self.session_recorder.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.profiler is not None:
+                self.profiler.stop()
+            self._stop_allocation_tracking()
+    def _start_allocation_tracking(self):
+        if self.allocation_tracker is None:
+            return
+        if self.pipeline_mode:
+            print("Allocation tracking is process-wide; per-stage numbers overlap across pipeline threads")
+        self.instrumentation.allocation_tracker = self.allocation_tracker
+        self.allocation_tracker.start()
+    def _stop_allocation_tracking(self):
+        if self.allocation_tracker is None:
+            return
+        self.instrumentation.allocation_tracker = None
+        self.allocation_tracker.stop()
+    def _run_serial(self):
         while True:
-            ret, frame = self.cap.read()
+            loop_start = self.clock.monotonic()
+            self.performance.start_frame()
+            self._begin_frame()
+            ret, frame = self._capture()
             if not ret:
-                print("Camera Error")
+                if isinstance(self.source, CameraSource):
+                    print("Camera Error")
                 break
-            frame = cv2.flip(frame, 1)
-            frame, hands_detected = self.tracker.find_hands(frame)
-            gesture = GestureType.NONE
-            state = GestureState.NONE
-            conf = 0
-            interaction_point = self.mouse_point
-            if hands_detected:
-                landmarks, found = self.tracker.find_positions(frame)
-                if found:
-                    fingers = self.tracker.fingers_up(landmarks)
-                    gesture, conf, state = self.recognizer.recognize_gesture(landmarks, fingers)
-                    interaction_point = (landmarks[8][1], landmarks[8][2])  # Index fingertip
-                    if gesture == GestureType.DRAW:
-                        self.canvas.draw(interaction_point, pressure=1.0, is_drawing=True)
-                        self.last_draw_state = True
-                    else:
-                        if self.last_draw_state:
-                            self.canvas.draw(None)
-                            self.last_draw_state = False
-                        if state == GestureState.COMPLETED:
-                            if gesture == GestureType.CLEAR:
-                                self.canvas.clear()
-                            elif gesture == GestureType.UNDO:
-                                self.canvas.undo()
-                            elif gesture == GestureType.REDO:
-                                self.canvas.redo()
-                            elif gesture == GestureType.SAVE:
-                                self.canvas.save("output/drawing.png")
-                            elif gesture == GestureType.TOOL_CHANGE:
-                                brushes = list(BrushType)
-                                idx = brushes.index(self.canvas.brush_type)
-                                self.canvas.set_brush(brushes[(idx + 1) % len(brushes)])
-            interaction = self.ui.handle_interaction(interaction_point, gesture == GestureType.SELECT or self.mouse_click)
-            if interaction:
-                if interaction["type"] == "clear":
+            self._sync_clock(self.source.last_frame_time)
+            frame, landmarks = self._infer(frame, self.source.last_frame_time)
+            final_frame = self._render(frame, landmarks)
+            if not self._display(final_frame):
+                break
+            self._end_frame()
+            self._throttle(loop_start)
+    def _begin_frame(self, trace=None):
+        if self.tracer is None:
+            return
+        if trace is not None:
+            self.tracer.attach(trace)
+        else:
+            self.tracer.begin_frame(self.frames_processed)
+    def _end_frame(self):
+        if self.tracer is not None:
+            self.tracer.end_frame()
+        if self.allocation_tracker is not None:
+            self.allocation_tracker.end_frame()
+        self.performance.end_frame()
+        if self.startup is not None and not self.startup.reported and self.tracker.is_ready():
+            self._report_startup()
+        if self.metrics_server is not None:
+            self._publish_metrics()
+        if self.governor is not None:
+            level = self.governor.update()
+            if level != self.quality_level:
+                self._apply_quality_level(level)
+    def _report_startup(self):
+        if self.tracker.ready_time is not None:
+            self.startup.mark("hand model ready", self.tracker.ready_time)
+        self.startup.add_duration("hand model init", self.tracker.model_init_time)
+        self.startup.add_duration("hand model warm-up", self.tracker.warmup_time)
+        self.startup.print_report()
+    def _publish_metrics(self):
+        now = self.clock.monotonic()
+        if self.last_metrics_time is not None and now - self.last_metrics_time < self.metrics_interval:
+            return
+        self.last_metrics_time = now
+        self.metrics_server.publish(self.get_performance_metrics())
+    def _apply_quality_level(self, level):
+        self.quality_level = level
+        base_size = self.inference_size if self.inference_size else self.capture_size
+        if self.governor.is_active("reduced_inference"):
+            inference_size = (max(160, base_size[0] // 2), max(120, base_size[1] // 2))
+        else:
+            inference_size = self.inference_size
+        self.tracker.set_inference_size(inference_size)
+        if self.inference_pool is not None:
+            self.inference_pool.set_inference_size(inference_size)
+        self.draw_landmarks = not self.governor.is_active("no_landmark_overlay")
+        self.canvas.fast_brushes = self.governor.is_active("fast_brushes")
+        self.ui.set_render_interval(3 if self.governor.is_active("throttled_ui") else 1)
+    def _throttle(self, loop_start):
+        if self.idle_monitor is not None:
+            self.clock.sleep(self.idle_monitor.get_frame_delay(loop_start))
+    def _run_pipeline(self):
+        self.preprocessor.set_pooled(False)
+        if self.inference_pool is not None:
+            self.pipeline = FramePipeline(self._capture, self._submit_inference, self.queue_size, self.drop_policy,
+                                          timestamp_fn=lambda: self.source.last_frame_time,
+                                          collect_fn=self._collect_inference,
+                                          pending_fn=self.inference_pool.in_flight, tracer=self.tracer)
+        else:
+            self.pipeline = FramePipeline(self._capture, self._infer, self.queue_size, self.drop_policy,
+                                          timestamp_fn=lambda: self.source.last_frame_time, tracer=self.tracer)
+        self.pipeline.start()
+        self.performance.start_frame()
+        try:
+            while True:
+                loop_start = self.clock.monotonic()
+                packet = self.pipeline.get(timeout=0.1)
+                if packet is None:
+                    if self.pipeline.is_finished():
+                        self.pipeline.raise_error()
+                        if isinstance(self.source, CameraSource):
+                            print("Camera Error")
+                        break
+                    continue
+                self._sync_clock(packet.timestamp)
+                self._begin_frame(packet.trace)
+                final_frame = self._render(packet.frame, packet.landmarks)
+                if not self._display(final_frame):
+                    break
+                self._end_frame()
+                self._throttle(loop_start)
+                self.performance.start_frame()
+        finally:
+            self.pipeline.stop()
+    def _sync_clock(self, timestamp):
+        if self.simulated_time:
+            self.clock.set_time(timestamp)
+    def get_stage_report(self):
+        report = {}
+        for name, summary in self.instrumentation.snapshot()["spans"].items():
+            report[name] = self._stage_entry(summary["count"], summary["total"] / 1000, summary)
+        report["overall"] = self._stage_entry(self.frames_processed, self.run_time, self.performance.get_latency_report().get("frame"))
+        return report
+    def get_performance_metrics(self):
+        self.instrumentation.set_gauge("fps", self.performance.fps)
+        self.instrumentation.set_gauge("canvas.revision", self.canvas.revision)
+        if self.governor is not None:
+            self.instrumentation.set_gauge("quality.level", self.governor.level)
+        if self.idle_monitor is not None:
+            self.instrumentation.set_gauge("idle", 1 if self.idle_monitor.is_idle() else 0)
+        components = {
+            "performance": self.performance.get_metrics(),
+            "canvas": self.canvas.get_performance_metrics(),
+            "compositor": self.compositor.get_stats(),
+            "preprocess": self.preprocessor.get_stats(),
+            "ui": self.ui.get_performance_metrics(),
+            "source": self.source.get_stats(),
+            "roi": self.tracker.get_roi_stats()
+        }
+        if self.pipeline is not None:
+            components["pipeline"] = self.pipeline.get_stats()
+        if self.inference_pool is not None:
+            components["inference_pool"] = self.inference_pool.get_stats()
+        if self.scheduler is not None:
+            components["scheduler"] = self.scheduler.get_stats()
+        if self.idle_monitor is not None:
+            components["idle"] = self.idle_monitor.get_stats()
+        if self.session_recorder is not None:
+            components["session_recorder"] = self.session_recorder.get_stats()
+        if self.governor is not None:
+            components["quality"] = self.governor.get_stats()
+        if self.tracer is not None:
+            components["tracer"] = self.tracer.get_stats()
+        if self.profiler is not None:
+            components["profiler"] = self.profiler.get_stats()
+        if self.startup is not None:
+            components["startup"] = self.startup.get_report()["marks"]
+        if self.allocation_tracker is not None:
+            components["allocations"] = {"frames": self.allocation_tracker.frames, "sampled_frames": self.allocation_tracker.sampled_frames}
+        metrics = self.instrumentation.snapshot()
+        metrics["components"] = components
+        return metrics
+    def _stage_entry(self, count, total, summary):
+        summary = summary or {}
+        return {
+            "frames": count,
+            "avg_ms": total / count * 1000 if count else 0,
+            "fps": count / total if total > 0 else 0,
+            "p50_ms": summary.get("session_p50", 0),
+            "p95_ms": summary.get("session_p95", 0),
+            "p99_ms": summary.get("session_p99", 0),
+            "max_ms": summary.get("session_max", 0)
+        }
+    def print_stage_report(self):
+        print(f"{'stage':<20}{'frames':>8}{'avg ms':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'fps':>10}")
+        for name, stats in self.get_stage_report().items():
+            print(f"{name:<20}{stats['frames']:>8}{stats['avg_ms']:>10.2f}{stats['p50_ms']:>8.2f}{stats['p95_ms']:>8.2f}"
+                  f"{stats['p99_ms']:>8.2f}{stats['max_ms']:>8.2f}{stats['fps']:>10.1f}")
+    def _capture(self):
+        with span("capture"):
+            ret, frame = self.source.read()
+            if not ret:
+                return False, None
+            if self.preprocessor.flips_pixels():
+                with trace_span("flip"):
+                    frame = self.preprocessor.process(frame)
+        return True, frame
+    def _infer(self, frame, timestamp=0):
+        with span("inference"):
+            frame, landmarks = self._run_inference(frame)
+        if self.recorder is not None:
+            self._record_landmarks(timestamp, landmarks)
+        return frame, landmarks
+    def _record_landmarks(self, timestamp, landmarks):
+        hands = []
+        handedness = []
+        predicted = getattr(landmarks, "predicted", False)
+        if len(landmarks):
+            hands.append(np.asarray(landmarks, dtype=np.float32)[:, 1:4])
+            if not predicted:
+                compact_landmarks, handedness = self.tracker.get_compact_results(display_space=True)
+                for hand in compact_landmarks[1:]:
+                    hands.append(hand * np.array([self.width, self.height, 1], dtype=np.float32))
+        self.recorder.record_frame(timestamp, hands, handedness, predicted)
+    def _run_inference(self, frame):
+        if self.idle_monitor is not None and not self.idle_monitor.should_run_inference():
+            return frame, SkippedLandmarks()
+        frame, landmarks = self._detect_landmarks(frame)
+        if self.idle_monitor is not None and not getattr(landmarks, "predicted", False):
+            self.idle_monitor.update(len(landmarks) > 0)
+        return frame, landmarks
+    def _detect_landmarks(self, frame):
+        if self.scheduler is not None and not self.scheduler.should_infer():
+            return frame, self.scheduler.predict()
+        if self.inference_pool is not None:
+            hand_landmarks, handedness = self.inference_pool.infer(frame)
+            frame, hands_detected = self.tracker.apply_compact_results(frame, hand_landmarks, handedness, self.draw_landmarks)
+        else:
+            frame, hands_detected = self.tracker.find_hands(frame, self.draw_landmarks)
+        frame, landmarks = self._extract_landmarks(frame, hands_detected)
+        if self.scheduler is not None:
+            self.scheduler.observe(landmarks)
+        return frame, landmarks
+    def _submit_inference(self, packet):
+        if self.idle_monitor is not None and (not self.idle_monitor.should_run_inference() or
+                                              self.idle_monitor.is_idle() and self.inference_pool.in_flight()):
+            packet.landmarks = SkippedLandmarks()
+            self.idle_packets.append(packet)
+            return False
+        packet.inference_start = time.perf_counter()
+        return self.inference_pool.submit(packet.frame, packet)
+    def _collect_inference(self, timeout):
+        packets = []
+        if self.idle_packets:
+            timeout = 0.0
+        for packet, hand_landmarks, handedness in self.inference_pool.collect(timeout):
+            if packet.trace is not None:
+                self.tracer.attach(packet.trace)
+            record("inference", time.perf_counter() - packet.inference_start, packet.inference_start)
+            frame, hands_detected = self.tracker.apply_compact_results(packet.frame, hand_landmarks, handedness, self.draw_landmarks)
+            packet.frame, packet.landmarks = self._extract_landmarks(frame, hands_detected)
+            if self.idle_monitor is not None:
+                self.idle_monitor.update(len(packet.landmarks) > 0)
+            if self.recorder is not None:
+                self._record_landmarks(packet.timestamp, packet.landmarks)
+            packets.append(packet)
+        if self.idle_packets:
+            oldest = self.inference_pool.oldest_pending_tag()
+            released = [packet for packet in self.idle_packets if oldest is None or packet.seq < oldest.seq]
+            self.idle_packets = self.idle_packets[len(released):]
+            packets = sorted(packets + released, key=lambda packet: packet.seq)
+        return packets
+    def _extract_landmarks(self, frame, hands_detected):
+        landmarks = []
+        if hands_detected:
+            with trace_span("landmarks"):
+                positions, found = self.tracker.find_position_array(frame, draw=self.draw_landmarks, target_size=(self.width, self.height))
+            if found:
+                landmarks = positions[0]
+        return frame, landmarks
+    def _render(self, frame, landmarks):
+        gesture, conf, state = self._process_landmarks(landmarks)
+        if getattr(landmarks, "skipped", False) and self.last_final_frame is not None and self.canvas.revision == self.last_composed_revision:
+            return self.last_final_frame
+        with span("compose"):
+            frame = self._fit_to_canvas(frame)
+            composed = self.compositor.compose(frame, self.canvas)
+        with span("ui"):
+            final_frame = self.ui.render(composed, in_place=True)
+            cv2.putText(final_frame, f"Gesture: {gesture.name} ({conf:.2f})", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        self.last_final_frame = final_frame
+        self.last_composed_revision = self.canvas.revision
+        return final_frame
+    def _process_landmarks(self, landmarks):
+        gesture = GestureType.NONE
+        state = GestureState.NONE
+        conf = 0
+        interaction_point = self.mouse_point
+        if len(landmarks):
+            with span("gesture"):
+                fingers = self.tracker.fingers_up(landmarks)
+                gesture, conf, state = self.recognizer.recognize_gesture(landmarks, fingers)
+                interaction_point = (int(landmarks[8][1]), int(landmarks[8][2]))  # Index fingertip
+            with span("draw"):
+                self._apply_gesture(gesture, state, interaction_point)
+        interaction = self.ui.handle_interaction(interaction_point, gesture == GestureType.SELECT or self.mouse_click)
+        if interaction:
+            self._apply_interaction(interaction)
+        self.mouse_click = False
+        return gesture, conf, state
+    def replay_landmarks(self, path, render=False):
+        reader = LandmarkSessionReader(path)
+        if render and self.sink is None:
+            self.sink = WindowSink("GestureArt", self.mouse_callback)
+        self.instrumentation.reset()
+        if render and self.session_recorder is not None:
+            self.session_recorder.start()
+        start_time = time.perf_counter()
+        try:
+            for index in range(len(reader)):
+                timestamp, hands, handedness, predicted = reader.get_frame(index)
+                landmarks = hands[0] if len(hands) else []
+                self._sync_clock(timestamp)
+                self.performance.start_frame()
+                self._begin_frame()
+                if render:
+                    ret, frame = self.source.read()
+                    if not ret:
+                        break
+                    if not self._display(self._render(frame, landmarks)):
+                        break
+                else:
+                    self._process_landmarks(landmarks)
+                    self.frames_processed += 1
+                self._end_frame()
+        finally:
+            self.run_time = time.perf_counter() - start_time
+            reader.close()
+            if self.sink is not None:
+                self.sink.close()
+            if self.session_recorder is not None:
+                self.session_recorder.close()
+        return self.get_stage_report()
+    def _fit_to_canvas(self, frame):
+        if frame.shape[1] == self.width and frame.shape[0] == self.height:
+            return frame
+        if self.display_buffer is None:
+            self.display_buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        cv2.resize(frame, (self.width, self.height), dst=self.display_buffer, interpolation=cv2.INTER_LINEAR)
+        return self.display_buffer
+    def _display(self, final_frame):
+        with span("display"):
+            key = self.sink.show(final_frame)
+        if self.session_recorder is not None:
+            with span("record"):
+                self.session_recorder.submit(final_frame)
+        if self.startup is not None and self.frames_processed == 0:
+            self.startup.mark("first frame")
+        self.frames_processed += 1
+        increment("frames.processed")
+        if key == ord('p') and self.profiler is not None:
+            self.profiler.toggle()
+        return key != ord('q')
+    def _apply_gesture(self, gesture, state, interaction_point):
+        if gesture == GestureType.DRAW:
+            self.canvas.draw(interaction_point, pressure=1.0, is_drawing=True)
+            self.last_draw_state = True
+        else:
+            if self.last_draw_state:
+                self.canvas.draw(None)
+                self.last_draw_state = False
+            if state == GestureState.COMPLETED:
+                if gesture == GestureType.CLEAR:
                     self.canvas.clear()
-                elif interaction["type"] == "undo":
+                elif gesture == GestureType.UNDO:
                     self.canvas.undo()
-                elif interaction["type"] == "redo":
+                elif gesture == GestureType.REDO:
                     self.canvas.redo()
-                elif interaction["type"] == "save":
+                elif gesture == GestureType.SAVE:
                     self.canvas.save("output/drawing.png")
-                elif interaction["type"] == "color_selected":
-                    self.canvas.set_color(interaction["color"])
-                elif interaction["type"] == "brush_selected":
-                    self.canvas.set_brush(interaction["name"])
-                elif interaction["type"] == "brush_property_changed":
-                    prop = interaction["name"]
-                    val = interaction["value"]
-                    if prop == "size":
-                        self.canvas.set_brush_size(int(val))
-                    elif prop == "opacity":
-                        self.canvas.set_opacity(float(val))
-                    elif prop == "hardness":
-                        self.canvas.set_hardness(float(val))
-                    elif prop == "flow":
-                        self.canvas.set_flow(float(val))
-            self.mouse_click = False
-            canvas_img = self.canvas.get_transformed_canvas()
-            composed = cv2.addWeighted(frame, 0.5, canvas_img, 0.5, 0)
-            final_frame = self.ui.render(composed)
-            cv2.putText(final_frame, f"Gesture: {gesture.name} ({conf:.2f})", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-            cv2.imshow("GestureArt", final_frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-        self.cap.release()
-        cv2.destroyAllWindows()
+                elif gesture == GestureType.TOOL_CHANGE:
+                    brushes = list(BrushType)
+                    idx = brushes.index(self.canvas.brush_type)
+                    self.canvas.set_brush(brushes[(idx + 1) % len(brushes)])
+    def _apply_interaction(self, interaction):
+        if interaction["type"] == "clear":
+            self.canvas.clear()
+        elif interaction["type"] == "undo":
+            self.canvas.undo()
+        elif interaction["type"] == "redo":
+            self.canvas.redo()
+        elif interaction["type"] == "save":
+            self.canvas.save("output/drawing.png")
+        elif interaction["type"] == "color_selected":
+            self.canvas.set_color(interaction["color"])
+        elif interaction["type"] == "brush_selected":
+            self.canvas.set_brush(interaction["name"])
+        elif interaction["type"] == "brush_property_changed":
+            prop = interaction["name"]
+            val = interaction["value"]
+            if prop == "size":
+                self.canvas.set_brush_size(int(val))
+            elif prop == "opacity":
+                self.canvas.set_opacity(float(val))
+            elif prop == "hardness":
+                self.canvas.set_hardness(float(val))
+            elif prop == "flow":
+                self.canvas.set_flow(float(val))
     def mouse_callback(self, event, x, y, flags, param):
         self.mouse_point = (x, y)
+        if self.idle_monitor is not None:
+            self.idle_monitor.notify_activity()
         if event == cv2.EVENT_LBUTTONDOWN:
             self.mouse_click = True
+def parse_size(value):
+    width, height = value.lower().split("x")
+    return (int(width), int(height))
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="GestureArt virtual drawing application")
+    parser.add_argument("--camera", type=int, default=0, help="Camera device ID to use")
+    parser.add_argument("--width", type=int, default=1280, help="Canvas width")
+    parser.add_argument("--height", type=int, default=720, help="Canvas height")
+    parser.add_argument("--video", help="Read frames from a video file instead of the camera")
+    parser.add_argument("--images", help="Read frames from a directory of images instead of the camera")
+    parser.add_argument("--headless", action="store_true", help="Do not open a window; discard output frames")
+    parser.add_argument("--output", help="Write output frames to a video file or image directory")
+    parser.add_argument("--no-mirror", action="store_true", help="Do not mirror input frames")
+    parser.add_argument("--mirror-landmarks", action="store_true", help="Mirror hand coordinates instead of flipping camera pixels; the camera image is shown unmirrored")
+    parser.add_argument("--pipeline", action="store_true", help="Run capture, inference and render on separate threads")
+    parser.add_argument("--queue-size", type=int, default=2, help="Pipeline queue size")
+    parser.add_argument("--drop-policy", choices=[DROP_OLDEST, DROP_NEWEST, BLOCK], default=None, help="Pipeline queue drop policy")
+    parser.add_argument("--workers", type=int, default=0, help="Number of hand inference worker processes (requires --pipeline)")
+    parser.add_argument("--inference-interval", type=int, default=1, help="Run full inference every N frames")
+    parser.add_argument("--roi", action="store_true", help="Run inference on a crop around the previous hand")
+    parser.add_argument("--capture-size", type=parse_size, help="Camera resolution as WIDTHxHEIGHT")
+    parser.add_argument("--inference-size", type=parse_size, help="Inference resolution as WIDTHxHEIGHT")
+    parser.add_argument("--idle-timeout", type=float, default=30.0, help="Seconds without hands before entering idle mode (0 disables)")
+    parser.add_argument("--idle-fps", type=float, default=5.0, help="Frame rate limit while idle")
+    parser.add_argument("--target-fps", type=float, help="Frame rate budget for adaptive quality (disabled by default)")
+    parser.add_argument("--trace-output", help="Write a Chrome trace of the last --trace-seconds of frames on exit")
+    parser.add_argument("--trace-seconds", type=float, default=10.0, help="Length of the frame trace flight recorder")
+    parser.add_argument("--slow-frame-ms", type=float, help="Dump the flight recorder when a frame takes longer than this")
+    parser.add_argument("--metrics-port", type=int, help="Serve live metrics on http://HOST:PORT/metrics (Prometheus) and /metrics.json")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Address for the metrics endpoint")
+    parser.add_argument("--profile", action="store_true", help="Start a sampling profile immediately (toggle any time with 'p' or SIGUSR1)")
+    parser.add_argument("--profile-duration", type=float, default=10.0, help="Seconds to sample before writing the profile (0 runs until stopped)")
+    parser.add_argument("--profile-interval", type=float, default=5.0, help="Sampling interval in milliseconds")
+    parser.add_argument("--profile-format", choices=["collapsed", "speedscope"], default="collapsed", help="Profile output format")
+    parser.add_argument("--track-allocations", action="store_true", help="Attribute allocations to stages with tracemalloc and print a report")
+    parser.add_argument("--allocation-snapshot-interval", type=int, default=30, help="Take allocation-site snapshots every N frames (0 disables)")
+    parser.add_argument("--machine-profile", default=DEFAULT_PROFILE_PATH, help="Machine profile written by test_system.py --diagnostics")
+    parser.add_argument("--no-machine-profile", action="store_true", help="Ignore the machine profile")
+    parser.add_argument("--no-instrumentation", action="store_true", help="Disable span, counter and gauge collection")
+    parser.add_argument("--record-landmarks", help="Record per-frame landmarks to a session file")
+    parser.add_argument("--record-video", help="Encode the composed output to this video file on a background thread")
+    parser.add_argument("--record-codec", default="mp4v", help="FourCC codec for --record-video")
+    parser.add_argument("--record-size", type=parse_size, help="Recording resolution as WIDTHxHEIGHT")
+    parser.add_argument("--record-fps", type=float, default=30.0, help="Frame rate of the composed output being recorded")
+    parser.add_argument("--record-every", type=int, default=1, help="Record every Nth composed frame")
+    parser.add_argument("--record-queue", type=int, default=8, help="Frames buffered for the encoder before new frames are dropped")
+    parser.add_argument("--replay-landmarks", help="Replay a landmark session file without running MediaPipe")
+    parser.add_argument("--render-replay", action="store_true", help="Compose and output frames while replaying landmarks")
+    args = parser.parse_args(argv)
+    if args.workers and not args.pipeline:
+        parser.error("--workers requires --pipeline; a serial loop waits on every worker result and only adds latency")
+    if args.workers and args.roi:
+        parser.error("--roi is not supported with --workers")
+    if args.workers and args.inference_interval > 1:
+        parser.error("--inference-interval is not supported with --workers")
+    return args
+def apply_machine_profile(args):
+    profile = None if args.no_machine_profile else load_profile(args.machine_profile)
+    if profile is None:
+        return False
+    settings = profile.get("settings", {})
+    applied = []
+    if args.capture_size is None and settings.get("capture_size"):
+        args.capture_size = tuple(settings["capture_size"])
+        applied.append(f"capture {args.capture_size[0]}x{args.capture_size[1]}")
+    if args.inference_size is None and settings.get("inference_size"):
+        args.inference_size = tuple(settings["inference_size"])
+        applied.append(f"inference {args.inference_size[0]}x{args.inference_size[1]}")
+    if not args.pipeline and settings.get("pipeline"):
+        args.pipeline = True
+        applied.append("pipeline")
+    if applied:
+        print(f"Machine profile {args.machine_profile}: {', '.join(applied)}")
+    return True
+def create_tracer(args):
+    if not args.trace_output and args.slow_frame_ms is None:
+        return None
+    return Tracer(flight_seconds=args.trace_seconds, slow_frame_ms=args.slow_frame_ms)
+def write_trace(app, args):
+    if app.tracer is not None and args.trace_output:
+        app.tracer.dump(args.trace_output)
+        print(f"Trace written to {args.trace_output}")
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.no_instrumentation:
+        set_enabled(False)
+    tracer = create_tracer(args)
+    allocation_tracker = AllocationTracker(args.allocation_snapshot_interval) if args.track_allocations else None
+    session_recorder = None
+    if args.record_video:
+        session_recorder = SessionRecorder(args.record_video, args.record_fps, args.record_codec, args.record_size,
+                                           args.record_every, args.record_queue)
+    profiler = SamplingProfiler(args.profile_interval / 1000.0, args.profile_duration, output_format=args.profile_format)
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(args.metrics_host, args.metrics_port)
+        if not metrics_server.start():
+            metrics_server = None
+    if args.replay_landmarks:
+        sink = FileSink(args.output) if args.output else (NullSink() if args.headless else None)
+        clock = SimulatedClock()
+        app = GestureArtApp(args.camera, args.width, args.height, source=BlankSource(args.width, args.height), sink=sink,
+                            tracker=HandTracker(enable_inference=False, clock=clock), clock=clock, idle_timeout=0, tracer=tracer,
+                            session_recorder=session_recorder)
+        app.replay_landmarks(args.replay_landmarks, render=args.render_replay)
+        app.print_stage_report()
+        write_trace(app, args)
+        return
+    startup = StartupTimer(STARTUP_BEGIN)
+    startup.mark("imports", IMPORTS_DONE)
+    replay = bool(args.video or args.images)
+    if not replay:
+        apply_machine_profile(args)
+    capture_size = args.capture_size if args.capture_size else (args.width, args.height)
+    clock = SimulatedClock() if replay else None
+    tracker = HandTracker(roi_tracking=args.roi, inference_size=args.inference_size, clock=clock, background_init=True)
+    startup.mark("hand model started")
+    source = open_source(args.video, args.images, args.camera, capture_size[0], capture_size[1])
+    startup.mark("source opened")
+    if args.output:
+        sink = FileSink(args.output)
+    elif args.headless:
+        sink = NullSink()
+    else:
+        sink = None
+    drop_policy = args.drop_policy if args.drop_policy else (BLOCK if replay else DROP_OLDEST)
+    app = GestureArtApp(args.camera, args.width, args.height, pipeline_mode=args.pipeline, queue_size=args.queue_size,
+                        drop_policy=drop_policy, inference_workers=args.workers, inference_interval=args.inference_interval,
+                        roi_tracking=args.roi, capture_size=capture_size, inference_size=args.inference_size,
+                        source=source, sink=sink, mirror=not args.no_mirror,
+                        mirror_landmarks=args.mirror_landmarks, record_landmarks=args.record_landmarks, clock=clock,
+                        idle_timeout=0 if replay else args.idle_timeout, idle_fps=args.idle_fps, target_fps=args.target_fps,
+                        tracer=tracer, metrics_server=metrics_server, profiler=profiler,
+                        allocation_tracker=allocation_tracker, tracker=tracker, startup=startup,
+                        session_recorder=session_recorder)
+    startup.mark("app created")
+    if replay:
+        tracker.wait_ready()
+    install_signal_handler(profiler)
+    if args.profile:
+        profiler.start()
+    try:
+        app.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+    if replay or args.headless:
+        app.print_stage_report()
+    if allocation_tracker is not None:
+        allocation_tracker.print_report()
+    write_trace(app, args)
 if __name__ == '__main__':
-    app = GestureArtApp()
-    app.run()
-
-
+    main()
@@ -0,0 +1,103 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+QUANTILES = (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99"))
+def _metric_name(*parts):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(str(part) for part in parts if part)).lower()
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"")
+def _is_number(value):
+    return isinstance(value, (int, float))
+def format_prometheus(metrics, prefix="gestureart"):
+    lines = []
+    spans = metrics.get("spans", {})
+    if spans:
+        name = _metric_name(prefix, "span_latency_ms")
+        lines.append(f"# TYPE {name} summary")
+        for span, summary in spans.items():
+            label = _label_value(span)
+            for key, quantile in QUANTILES:
+                lines.append(f"{name}{{span=\"{label}\",quantile=\"{quantile}\"}} {summary[key]:.6f}")
+            lines.append(f"{name}_sum{{span=\"{label}\"}} {summary.get('total', 0):.6f}")
+            lines.append(f"{name}_count{{span=\"{label}\"}} {summary['count']}")
+        name = _metric_name(prefix, "span_max_ms")
+        lines.append(f"# TYPE {name} gauge")
+        for span, summary in spans.items():
+            lines.append(f"{name}{{span=\"{_label_value(span)}\"}} {summary['session_max']:.6f}")
+    for counter, value in metrics.get("counters", {}).items():
+        name = _metric_name(prefix, counter, "total")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+    for gauge, value in metrics.get("gauges", {}).items():
+        if not _is_number(value):
+            continue
+        name = _metric_name(prefix, gauge)
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {float(value)}")
+    for component, stats in metrics.get("components", {}).items():
+        for key, value in stats.items():
+            if not _is_number(value):
+                continue
+            name = _metric_name(prefix, component, key)
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(value)}")
+    return "\n".join(lines) + "\n"
+class MetricsServer:
+    def __init__(self, host="127.0.0.1", port=9108, prefix="gestureart"):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.snapshot = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+        self.requests_served = 0
+    def publish(self, metrics):
+        with self.lock:
+            self.snapshot = metrics
+    def get_snapshot(self):
+        with self.lock:
+            return self.snapshot
+    def start(self):
+        metrics_server = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/metrics":
+                    body = format_prometheus(metrics_server.get_snapshot(), metrics_server.prefix).encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path in ("/metrics.json", "/json"):
+                    body = json.dumps(metrics_server.get_snapshot(), default=str).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                metrics_server.requests_served += 1
+            def log_message(self, format, *args):
+                pass
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            print(f"Failed to start metrics server on {self.host}:{self.port}: {e}")
+            self.server = None
+            return False
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        return True
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
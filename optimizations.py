@@ -1,55 +1,142 @@
 import cv2
+import math
 import numpy as np
 import os
+import threading
 import time
+from clock import get_clock
+class LatencyHistogram:
+    def __init__(self, window=120, min_value=1e-5, max_value=10.0, buckets_per_decade=20):
+        self.window = window
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.index = 0
+        self.window_count = 0
+        self.window_total = 0.0
+        self.log_min = math.log10(min_value)
+        self.buckets_per_decade = buckets_per_decade
+        num_buckets = int(math.ceil((math.log10(max_value) - self.log_min) * buckets_per_decade)) + 2
+        self.buckets = np.zeros(num_buckets, dtype=np.int64)
+        self.bucket_values = np.power(10.0, self.log_min + (np.arange(num_buckets) - 0.5) / buckets_per_decade)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+    def record(self, value):
+        if self.window_count < self.window:
+            self.window_count += 1
+        else:
+            self.window_total -= self.samples[self.index]
+        self.samples[self.index] = value
+        self.window_total += value
+        self.index = (self.index + 1) % self.window
+        if self.index == 0 and self.window_count == self.window:
+            self.window_total = float(self.samples.sum())
+        if value > 0:
+            bucket = int((math.log10(value) - self.log_min) * self.buckets_per_decade) + 1
+            bucket = min(max(bucket, 0), len(self.buckets) - 1)
+        else:
+            bucket = 0
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+    def get_window(self):
+        if self.window_count == self.window:
+            return self.samples
+        start = self.index - self.window_count
+        if start >= 0:
+            return self.samples[start:self.index]
+        return np.concatenate((self.samples[start:], self.samples[:self.index]))
+    def reset_window(self):
+        self.window_count = 0
+        self.window_total = 0.0
+    def window_mean(self):
+        return self.window_total / self.window_count if self.window_count else 0.0
+    def window_percentiles(self, percentiles=(50, 95, 99)):
+        if not self.window_count:
+            return [0.0 for _ in percentiles]
+        return [float(v) for v in np.percentile(self.get_window(), percentiles)]
+    def session_percentiles(self, percentiles=(50, 95, 99)):
+        if not self.count:
+            return [0.0 for _ in percentiles]
+        cumulative = np.cumsum(self.buckets)
+        values = []
+        for p in percentiles:
+            bucket = int(np.searchsorted(cumulative, self.count * p / 100.0))
+            values.append(min(float(self.bucket_values[min(bucket, len(self.bucket_values) - 1)]), self.max))
+        return values
+    def get_summary(self):
+        p50, p95, p99 = self.window_percentiles()
+        s50, s95, s99 = self.session_percentiles()
+        window = self.get_window()
+        return {
+            "count": self.count,
+            "mean": self.window_mean() * 1000,
+            "p50": p50 * 1000,
+            "p95": p95 * 1000,
+            "p99": p99 * 1000,
+            "max": (float(window.max()) if self.window_count else 0.0) * 1000,
+            "session_mean": (self.total / self.count if self.count else 0.0) * 1000,
+            "session_p50": s50 * 1000,
+            "session_p95": s95 * 1000,
+            "session_p99": s99 * 1000,
+            "session_max": self.max * 1000
+        }
 class PerformanceOptimizer:
-    def __init__(self):
-        self.frame_times = []
-        self.max_frame_times = 30
+    def __init__(self, window=120):
+        self.window = window
+        self.stages = {}
+        self.frame_hist = self.get_histogram("frame")
+        self.draw_hist = self.get_histogram("draw")
+        self.process_hist = self.get_histogram("process")
         self.fps = 0
         self.last_frame_time = 0
-        self.draw_times = []
-        self.max_draw_times = 30
         self.avg_draw_time = 0
-        self.process_times = []
-        self.max_process_times = 30
         self.avg_process_time = 0
-        self.memory_usage = []
-        self.max_memory_points = 30
         self.start_time = time.time()
         self.total_frames = 0
+        self.frame_start_time = time.perf_counter()
+    def get_histogram(self, name):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram(self.window)
+            self.stages[name] = histogram
+        return histogram
+    def record_stage(self, name, elapsed):
+        self.get_histogram(name).record(elapsed)
     def start_frame(self):
-        self.frame_start_time = time.time()
+        self.frame_start_time = time.perf_counter()
         return self.frame_start_time
     def end_frame(self):
-        end_time = time.time()
-        frame_time = end_time - self.frame_start_time
-        self.frame_times.append(frame_time)
-        if len(self.frame_times) > self.max_frame_times:
-            self.frame_times.pop(0)
-        if self.frame_times:
-            avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-            self.fps = 1.0 / avg_frame_time if avg_frame_time > 0 else 0
+        frame_time = time.perf_counter() - self.frame_start_time
+        self.frame_hist.record(frame_time)
+        avg_frame_time = self.frame_hist.window_mean()
+        self.fps = 1.0 / avg_frame_time if avg_frame_time > 0 else 0
         self.last_frame_time = frame_time
         self.total_frames += 1
         return frame_time
     def record_draw_time(self, draw_time):
-        self.draw_times.append(draw_time)
-        if len(self.draw_times) > self.max_draw_times:
-            self.draw_times.pop(0)
-        if self.draw_times:
-            self.avg_draw_time = sum(self.draw_times) / len(self.draw_times)
+        self.draw_hist.record(draw_time)
+        self.avg_draw_time = self.draw_hist.window_mean()
     def record_process_time(self, process_time):
-        self.process_times.append(process_time)
-        if len(self.process_times) > self.max_process_times:
-            self.process_times.pop(0)
-        if self.process_times:
-            self.avg_process_time = sum(self.process_times) / len(self.process_times)
+        self.process_hist.record(process_time)
+        self.avg_process_time = self.process_hist.window_mean()
+    def get_latency_report(self):
+        return {name: histogram.get_summary() for name, histogram in self.stages.items() if histogram.count}
     def get_metrics(self):
+        frame = self.frame_hist.get_summary()
         return {
             "fps": self.fps,
             "last_frame_time": self.last_frame_time * 1000,
-            "avg_frame_time": (sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0) * 1000,
+            "avg_frame_time": frame["mean"],
+            "p50_frame_time": frame["p50"],
+            "p95_frame_time": frame["p95"],
+            "p99_frame_time": frame["p99"],
+            "max_frame_time": frame["max"],
+            "session_p99_frame_time": frame["session_p99"],
+            "session_max_frame_time": frame["session_max"],
             "avg_draw_time": self.avg_draw_time * 1000,
             "avg_process_time": self.avg_process_time * 1000,
             "total_frames": self.total_frames,
@@ -61,52 +148,140 @@ class PerformanceOptimizer:
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         cv2.putText(frame, f"Frame time: {metrics['last_frame_time']:.1f} ms", (10, 60), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-        cv2.putText(frame, f"Draw time: {metrics['avg_draw_time']:.1f} ms", (10, 80), 
+        cv2.putText(frame, f"p50/p95/p99/max: {metrics['p50_frame_time']:.1f}/{metrics['p95_frame_time']:.1f}/"
+                           f"{metrics['p99_frame_time']:.1f}/{metrics['max_frame_time']:.1f} ms", (10, 80), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        cv2.putText(frame, f"Session p99/max: {metrics['session_p99_frame_time']:.1f}/{metrics['session_max_frame_time']:.1f} ms", (10, 100), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-        cv2.putText(frame, f"Process time: {metrics['avg_process_time']:.1f} ms", (10, 100), 
+        cv2.putText(frame, f"Draw time: {metrics['avg_draw_time']:.1f} ms", (10, 120), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-        cv2.putText(frame, f"Total frames: {metrics['total_frames']}", (10, 120), 
+        cv2.putText(frame, f"Process time: {metrics['avg_process_time']:.1f} ms", (10, 140), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        cv2.putText(frame, f"Total frames: {metrics['total_frames']}", (10, 160), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
         uptime_seconds = metrics['uptime']
         minutes, seconds = divmod(uptime_seconds, 60)
         hours, minutes = divmod(minutes, 60)
-        cv2.putText(frame, f"Uptime: {int(hours)}h {int(minutes)}m {int(seconds)}s", (10, 140), 
+        cv2.putText(frame, f"Uptime: {int(hours)}h {int(minutes)}m {int(seconds)}s", (10, 180), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
         return frame
 class CameraOptimizer:
-    def __init__(self, camera_id=0, width=1280, height=720):
+    def __init__(self, camera_id=0, width=1280, height=720, buffer_size=1, fourcc="MJPG", threaded=True):
         self.camera_id = camera_id
         self.width = width
         self.height = height
+        self.buffer_size = buffer_size
+        self.fourcc = fourcc
+        self.threaded = threaded
         self.cap = None
         self.frame_buffer = None
         self.last_frame_time = 0
         self.is_initialized = False
+        self.negotiated = {}
+        self.frame_condition = threading.Condition()
+        self.grab_thread = None
+        self.running = False
+        self.latest_frame = None
+        self.latest_frame_time = 0
+        self.latest_seq = 0
+        self.last_read_seq = 0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_read = 0
+        self.read_failures = 0
     def initialize(self):
         self.cap = cv2.VideoCapture(self.camera_id)
+        if self.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
         self.is_initialized = self.cap.isOpened()
         if self.is_initialized:
+            self.negotiated = self._read_negotiated()
             self.frame_buffer = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            if self.threaded:
+                self.running = True
+                self.grab_thread = threading.Thread(target=self._grab_loop, name="camera-grabber", daemon=True)
+                self.grab_thread.start()
         return self.is_initialized
-    def read_frame(self):
+    def _read_negotiated(self):
+        fourcc_code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((fourcc_code >> (8 * i)) & 0xFF) for i in range(4)) if fourcc_code > 0 else ""
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+            "fourcc": fourcc
+        }
+    def _grab_loop(self):
+        while self.running:
+            success, frame = self.cap.read()
+            capture_time = time.monotonic()
+            with self.frame_condition:
+                if not success:
+                    self.read_failures += 1
+                    self.running = False
+                    self.frame_condition.notify_all()
+                    break
+                if self.latest_seq > self.last_read_seq:
+                    self.frames_dropped += 1
+                self.latest_frame = frame
+                self.latest_frame_time = capture_time
+                self.latest_seq += 1
+                self.frames_captured += 1
+                self.frame_condition.notify_all()
+    def read_frame(self, timeout=1.0):
         if not self.is_initialized:
             if not self.initialize():
                 return False, None
-        success, frame = self.cap.read()
-        if not success:
-            return False, self.frame_buffer
-        self.frame_buffer = frame
-        self.last_frame_time = time.time()
-        return True, frame
+        if not self.threaded:
+            success, frame = self.cap.read()
+            if not success:
+                self.read_failures += 1
+                return False, self.frame_buffer
+            self.frame_buffer = frame
+            self.last_frame_time = time.monotonic()
+            self.frames_captured += 1
+            self.frames_read += 1
+            return True, frame
+        with self.frame_condition:
+            if not self.frame_condition.wait_for(lambda: self.latest_seq > self.last_read_seq or not self.running, timeout):
+                return False, self.frame_buffer
+            if self.latest_seq <= self.last_read_seq:
+                return False, self.frame_buffer
+            self.last_read_seq = self.latest_seq
+            self.frame_buffer = self.latest_frame
+            self.last_frame_time = self.latest_frame_time
+            self.frames_read += 1
+            return True, self.frame_buffer
+    def get_frame_age(self):
+        if not self.last_frame_time:
+            return 0
+        return time.monotonic() - self.last_frame_time
+    def get_stats(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_read": self.frames_read,
+            "frames_dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "frame_age": self.get_frame_age() * 1000,
+            "negotiated": self.negotiated
+        }
     def release(self):
+        self.running = False
+        if self.grab_thread is not None:
+            self.grab_thread.join(timeout=1.0)
+            self.grab_thread = None
         if self.cap is not None:
             self.cap.release()
             self.is_initialized = False
 class GestureOptimizer:
-    def __init__(self, smoothing_factor=0.7, history_size=5):
+    def __init__(self, smoothing_factor=0.7, history_size=5, clock=None):
         self.smoothing_factor = smoothing_factor
+        self.clock = get_clock(clock)
         self.history_size = history_size
         self.position_history = []
         self.smoothed_position = None
@@ -116,7 +291,7 @@ class GestureOptimizer:
     def update(self, position):
         if position is None:
             return None
-        current_time = time.time()
+        current_time = self.clock.time()
         dt = current_time - self.last_update_time if self.last_update_time > 0 else 0
         self.last_update_time = current_time
         self.position_history.append(position)
@@ -158,6 +333,191 @@ class GestureOptimizer:
         self.velocity = np.zeros(2)
         self.acceleration = np.zeros(2)
         self.last_update_time = 0
+class PredictedLandmarks(np.ndarray):
+    predicted = True
+class InferenceScheduler:
+    def __init__(self, interval=3, error_threshold=25.0, max_prediction_time=0.2, smoothing_factor=0.5, clock=None):
+        self.clock = get_clock(clock)
+        self.interval = max(1, interval)
+        self.error_threshold = error_threshold
+        self.max_prediction_time = max_prediction_time
+        self.motion = GestureOptimizer(smoothing_factor=smoothing_factor, clock=self.clock)
+        self.last_landmarks = None
+        self.last_center = None
+        self.frames_since_inference = 0
+        self.force_inference = True
+        self.last_error = 0
+        self.inference_count = 0
+        self.predicted_count = 0
+        self.forced_count = 0
+    def should_infer(self):
+        if self.force_inference or self.last_landmarks is None:
+            return True
+        return self.frames_since_inference + 1 >= self.interval
+    def observe(self, landmarks):
+        self.inference_count += 1
+        self.frames_since_inference = 0
+        if landmarks is None or len(landmarks) == 0:
+            self.motion.reset()
+            self.last_landmarks = None
+            self.last_center = None
+            self.force_inference = True
+            return
+        center = self._center(landmarks)
+        if self.last_center is not None:
+            predicted_center = self._predicted_center()
+            self.last_error = float(np.hypot(predicted_center[0] - center[0], predicted_center[1] - center[1]))
+            self.force_inference = self.last_error > self.error_threshold
+            if self.force_inference:
+                self.forced_count += 1
+        else:
+            self.force_inference = False
+        self.motion.update(center)
+        self.last_landmarks = np.array(landmarks, dtype=np.float32)
+        self.last_center = center
+    def predict(self):
+        if self.last_landmarks is None:
+            return np.zeros((0, 4), dtype=np.float32).view(PredictedLandmarks)
+        self.frames_since_inference += 1
+        self.predicted_count += 1
+        predicted_center = self._predicted_center()
+        dx = predicted_center[0] - self.last_center[0]
+        dy = predicted_center[1] - self.last_center[1]
+        predicted = self.last_landmarks.copy()
+        predicted[:, 1] = np.round(predicted[:, 1] + dx)
+        predicted[:, 2] = np.round(predicted[:, 2] + dy)
+        return predicted.view(PredictedLandmarks)
+    def _predicted_center(self):
+        time_ahead = min(self.max_prediction_time, max(0.0, self.clock.time() - self.motion.last_update_time))
+        predicted = self.motion.predict_position(time_ahead)
+        smoothed = self.motion.smoothed_position
+        return (self.last_center[0] + predicted[0] - smoothed[0], self.last_center[1] + predicted[1] - smoothed[1])
+    def _center(self, landmarks):
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        return (float(landmarks[:, 1].mean()), float(landmarks[:, 2].mean()))
+    def get_stats(self):
+        total = self.inference_count + self.predicted_count
+        return {
+            "interval": self.interval,
+            "inference_count": self.inference_count,
+            "predicted_count": self.predicted_count,
+            "forced_count": self.forced_count,
+            "inference_ratio": self.inference_count / total if total else 0,
+            "last_error": self.last_error
+        }
+    def reset(self):
+        self.motion.reset()
+        self.last_landmarks = None
+        self.last_center = None
+        self.frames_since_inference = 0
+        self.force_inference = True
+class SkippedLandmarks(list):
+    skipped = True
+class IdleMonitor:
+    ACTIVE = "active"
+    IDLE = "idle"
+    def __init__(self, idle_timeout=30.0, idle_inference_interval=0.25, idle_fps=5.0, clock=None):
+        self.idle_timeout = idle_timeout
+        self.idle_inference_interval = idle_inference_interval
+        self.idle_fps = idle_fps
+        self.clock = get_clock(clock)
+        self.state = self.ACTIVE
+        self.last_activity_time = self.clock.monotonic()
+        self.last_inference_time = 0
+        self.state_start_time = self.last_activity_time
+        self.idle_transitions = 0
+        self.active_transitions = 0
+        self.idle_time = 0
+        self.skipped_inferences = 0
+    def is_idle(self):
+        return self.state == self.IDLE
+    def should_run_inference(self):
+        if self.state == self.ACTIVE:
+            return True
+        if self.clock.monotonic() - self.last_inference_time >= self.idle_inference_interval:
+            return True
+        self.skipped_inferences += 1
+        return False
+    def update(self, hands_detected):
+        now = self.clock.monotonic()
+        self.last_inference_time = now
+        if hands_detected:
+            self.notify_activity()
+        elif self.state == self.ACTIVE and now - self.last_activity_time > self.idle_timeout:
+            self.state = self.IDLE
+            self.state_start_time = now
+            self.idle_transitions += 1
+            print(f"Idle: no hands for {self.idle_timeout:.0f}s, reducing inference rate")
+    def notify_activity(self):
+        now = self.clock.monotonic()
+        self.last_activity_time = now
+        if self.state == self.IDLE:
+            self.idle_time += now - self.state_start_time
+            self.state = self.ACTIVE
+            self.state_start_time = now
+            self.active_transitions += 1
+            print("Active: hand detected, resuming full rate")
+    def get_frame_delay(self, frame_start_time):
+        if self.state != self.IDLE or self.idle_fps <= 0:
+            return 0
+        return max(0.0, 1.0 / self.idle_fps - (self.clock.monotonic() - frame_start_time))
+    def get_stats(self):
+        idle_time = self.idle_time
+        if self.state == self.IDLE:
+            idle_time += self.clock.monotonic() - self.state_start_time
+        return {
+            "state": self.state,
+            "idle_transitions": self.idle_transitions,
+            "active_transitions": self.active_transitions,
+            "idle_time": idle_time,
+            "skipped_inferences": self.skipped_inferences
+        }
+class QualityGovernor:
+    LEVELS = ["full", "reduced_inference", "no_landmark_overlay", "fast_brushes", "throttled_ui"]
+    def __init__(self, performance, target_fps=30.0, degrade_ratio=1.15, recover_ratio=0.7, min_samples=15, cooldown=2.0, clock=None):
+        self.performance = performance
+        self.target_fps = target_fps
+        self.frame_budget = 1.0 / target_fps
+        self.degrade_ratio = degrade_ratio
+        self.recover_ratio = recover_ratio
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.clock = get_clock(clock)
+        self.level = 0
+        self.last_change_time = self.clock.monotonic()
+        self.transitions = []
+        self.max_transitions = 50
+    def update(self):
+        frame_hist = self.performance.frame_hist
+        if frame_hist.window_count < self.min_samples:
+            return self.level
+        now = self.clock.monotonic()
+        if now - self.last_change_time < self.cooldown:
+            return self.level
+        avg_frame_time = frame_hist.window_mean()
+        if avg_frame_time > self.frame_budget * self.degrade_ratio and self.level < len(self.LEVELS) - 1:
+            self._set_level(self.level + 1, avg_frame_time, now)
+        elif avg_frame_time < self.frame_budget * self.recover_ratio and self.level > 0:
+            self._set_level(self.level - 1, avg_frame_time, now)
+        return self.level
+    def _set_level(self, level, avg_frame_time, now):
+        previous = self.level
+        self.level = level
+        self.last_change_time = now
+        self.performance.frame_hist.reset_window()
+        self.transitions.append({"time": now, "from": self.LEVELS[previous], "to": self.LEVELS[level], "frame_time": avg_frame_time * 1000})
+        if len(self.transitions) > self.max_transitions:
+            self.transitions.pop(0)
+        print(f"Quality: {self.LEVELS[previous]} -> {self.LEVELS[level]} (avg frame {avg_frame_time * 1000:.1f} ms, budget {self.frame_budget * 1000:.1f} ms)")
+    def is_active(self, level_name):
+        return self.level >= self.LEVELS.index(level_name)
+    def get_stats(self):
+        return {
+            "level": self.level,
+            "level_name": self.LEVELS[self.level],
+            "target_fps": self.target_fps,
+            "transitions": len(self.transitions)
+        }
 if __name__ == "__main__":
     performance_optimizer = PerformanceOptimizer()
     camera_optimizer = CameraOptimizer()
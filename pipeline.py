@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+class FramePacket:
+    def __init__(self, seq, frame, timestamp):
+        self.seq = seq
+        self.frame = frame
+        self.timestamp = timestamp
+        self.landmarks = []
+        self.inference_start = 0
+        self.trace = None
+class StageQueue:
+    def __init__(self, maxsize=2, drop_policy=DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.queue = queue.Queue(maxsize=max(1, maxsize))
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.lock = threading.Lock()
+    def put(self, item, stop_event=None):
+        if self.drop_policy == BLOCK:
+            while stop_event is None or not stop_event.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                if self.drop_policy == DROP_NEWEST:
+                    with self.lock:
+                        self.dropped += 1
+                    return False
+                try:
+                    self.queue.get_nowait()
+                    with self.lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    def qsize(self):
+        return self.queue.qsize()
+class FramePipeline:
+    def __init__(self, capture_fn, inference_fn, queue_size=2, drop_policy=DROP_OLDEST, timestamp_fn=None, collect_fn=None,
+                 pending_fn=None, tracer=None):
+        self.capture_fn = capture_fn
+        self.inference_fn = inference_fn
+        self.collect_fn = collect_fn
+        self.pending_fn = pending_fn
+        self.tracer = tracer
+        self.timestamp_fn = timestamp_fn if timestamp_fn else time.monotonic
+        self.inference_queue = StageQueue(queue_size, drop_policy)
+        self.render_queue = StageQueue(queue_size, drop_policy)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.capture_failed = False
+        self.inference_done = False
+        self.error = None
+        self.next_seq = 0
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.frames_rendered = 0
+        self.last_rendered_seq = -1
+    def start(self):
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+    def _fail(self, error):
+        if self.error is None:
+            self.error = error
+        self.stop_event.set()
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+    def is_running(self):
+        return not self.stop_event.is_set()
+    def is_finished(self):
+        return self.inference_done and self.render_queue.qsize() == 0
+    def _capture_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                trace = self.tracer.begin_frame(self.next_seq) if self.tracer is not None else None
+                ret, frame = self.capture_fn()
+                if not ret:
+                    break
+                packet = FramePacket(self.next_seq, frame, self.timestamp_fn())
+                packet.trace = trace
+                self.next_seq += 1
+                self.frames_captured += 1
+                self.inference_queue.put(packet, self.stop_event)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.capture_failed = True
+    def _inference_loop(self):
+        try:
+            if self.collect_fn is not None:
+                self._async_inference_loop()
+            else:
+                self._sync_inference_loop()
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.inference_done = True
+    def _sync_inference_loop(self):
+        while not self.stop_event.is_set():
+            packet = self.inference_queue.get(timeout=0.1)
+            if packet is None:
+                if self.capture_failed and self.inference_queue.qsize() == 0:
+                    break
+                continue
+            if packet.trace is not None:
+                self.tracer.attach(packet.trace)
+            packet.frame, packet.landmarks = self.inference_fn(packet.frame, packet.timestamp)
+            self.frames_inferred += 1
+            self.render_queue.put(packet, self.stop_event)
+    def _async_inference_loop(self):
+        while not self.stop_event.is_set():
+            packet = self.inference_queue.get(timeout=0.005)
+            if packet is not None:
+                if packet.trace is not None:
+                    self.tracer.attach(packet.trace)
+                self.inference_fn(packet)
+            done_packets = self.collect_fn(0.0 if packet is not None else 0.005)
+            for done in done_packets:
+                self.frames_inferred += 1
+                self.render_queue.put(done, self.stop_event)
+            if packet is None and not done_packets and self.capture_failed and self.inference_queue.qsize() == 0:
+                if self.pending_fn is None or self.pending_fn() == 0:
+                    break
+    def get(self, timeout=0.1):
+        packet = self.render_queue.get(timeout=timeout)
+        if packet is not None:
+            self.frames_rendered += 1
+            self.last_rendered_seq = packet.seq
+        return packet
+    def get_stats(self):
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_inferred": self.frames_inferred,
+            "frames_rendered": self.frames_rendered,
+            "dropped_before_inference": self.inference_queue.dropped,
+            "dropped_before_render": self.render_queue.dropped,
+            "last_rendered_seq": self.last_rendered_seq
+        }
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+class FramePreprocessor:
+    def __init__(self, mirror=True, mirror_landmarks=False, buffers=2):
+        self.mirror = mirror
+        self.mirror_landmarks = mirror and mirror_landmarks
+        self.buffers = max(1, buffers)
+        self.pooled = True
+        self.pool = []
+        self.pool_index = 0
+        self.frames = 0
+        self.frames_flipped = 0
+        self.allocations = 0
+    def set_pooled(self, pooled):
+        self.pooled = pooled
+        if not pooled:
+            self.pool = []
+    def flips_pixels(self):
+        return self.mirror and not self.mirror_landmarks
+    def _next_buffer(self, frame):
+        if len(self.pool) != self.buffers or self.pool[0].shape != frame.shape or self.pool[0].dtype != frame.dtype:
+            self.pool = [np.empty_like(frame) for _ in range(self.buffers)]
+            self.pool_index = 0
+            self.allocations += self.buffers
+        buffer = self.pool[self.pool_index]
+        self.pool_index = (self.pool_index + 1) % len(self.pool)
+        return buffer
+    def process(self, frame):
+        self.frames += 1
+        if not self.flips_pixels():
+            return frame
+        self.frames_flipped += 1
+        if not self.pooled:
+            self.allocations += 1
+            return cv2.flip(frame, 1)
+        buffer = self._next_buffer(frame)
+        cv2.flip(frame, 1, dst=buffer)
+        return buffer
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "frames_flipped": self.frames_flipped,
+            "mirror_mode": "landmarks" if self.mirror_landmarks else "pixels" if self.mirror else "none",
+            "pooled": self.pooled,
+            "buffers": len(self.pool),
+            "buffer_allocations": self.allocations,
+            "buffer_bytes": sum(buffer.nbytes for buffer in self.pool)
+        }
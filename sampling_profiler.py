@@ -0,0 +1,142 @@
+import json
+import os
+import signal
+import sys
+import threading
+import time
+COLLAPSED = "collapsed"
+SPEEDSCOPE = "speedscope"
+class SamplingProfiler:
+    def __init__(self, interval=0.005, duration=10.0, output_dir="output/profiles", output_format=COLLAPSED):
+        if output_format not in (COLLAPSED, SPEEDSCOPE):
+            raise ValueError(f"Unknown profile format: {output_format}")
+        self.interval = interval
+        self.duration = duration
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stacks = {}
+        self.samples = 0
+        self.start_time = 0
+        self.elapsed = 0
+        self.last_output = None
+        self.profiles_written = 0
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+    def start(self, duration=None):
+        if self.is_running():
+            return False
+        self.stacks = {}
+        self.samples = 0
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._sample_loop, args=(duration if duration is not None else self.duration,),
+                                       name="sampling-profiler", daemon=True)
+        self.thread.start()
+        print(f"Sampling profiler started ({self.interval * 1000:.1f} ms interval)")
+        return True
+    def stop(self, wait=True):
+        if not self.is_running():
+            return self.last_output
+        self.stop_event.set()
+        if wait:
+            self.thread.join()
+            return self.last_output
+        return None
+    def toggle(self, duration=None):
+        if self.is_running():
+            self.stop(wait=False)
+        else:
+            self.start(duration)
+    def _sample_loop(self, duration):
+        own_id = threading.get_ident()
+        self.start_time = time.perf_counter()
+        deadline = self.start_time + duration if duration else None
+        while not self.stop_event.is_set():
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                key = (thread_names.get(thread_id, str(thread_id)), tuple(reversed(stack)))
+                with self.lock:
+                    self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.stop_event.wait(self.interval)
+        self.elapsed = time.perf_counter() - self.start_time
+        self.last_output = self.write()
+        print(f"Sampling profile written to {self.last_output} ({self.samples} samples, {self.elapsed:.1f} s)")
+    def write(self, path=None):
+        if path is None:
+            extension = "txt" if self.output_format == COLLAPSED else "speedscope.json"
+            path = os.path.join(self.output_dir, f"profile_{time.strftime('%Y%m%d_%H%M%S')}.{extension}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            stacks = dict(self.stacks)
+        if self.output_format == COLLAPSED:
+            self._write_collapsed(path, stacks)
+        else:
+            self._write_speedscope(path, stacks)
+        self.profiles_written += 1
+        return path
+    def _frame_name(self, frame):
+        name, filename, line = frame
+        return f"{name} ({os.path.basename(filename)}:{line})"
+    def _write_collapsed(self, path, stacks):
+        with open(path, "w") as f:
+            for (thread_name, stack), count in sorted(stacks.items(), key=lambda item: -item[1]):
+                names = [thread_name] + [self._frame_name(frame).replace(";", ":") for frame in stack]
+                f.write(f"{';'.join(names)} {count}\n")
+    def _write_speedscope(self, path, stacks):
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for (thread_name, stack), count in stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            profile = profiles.setdefault(thread_name, {"samples": [], "weights": []})
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(profile["weights"]),
+                "samples": profile["samples"],
+                "weights": profile["weights"]
+            } for thread_name, profile in profiles.items()],
+            "name": "GestureArt sampling profile",
+            "exporter": "gestureart-sampling-profiler"
+        }
+        with open(path, "w") as f:
+            json.dump(document, f)
+    def get_stats(self):
+        return {
+            "running": self.is_running(),
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks),
+            "profiles_written": self.profiles_written
+        }
+def install_signal_handler(profiler, signal_name="SIGUSR1"):
+    signum = getattr(signal, signal_name, None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signum, lambda signum, frame: profiler.toggle())
+    return True
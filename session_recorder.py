@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import os
+import queue
+import threading
+import time
+class SessionRecorder:
+    def __init__(self, path, fps=30.0, codec="mp4v", size=None, decimation=1, queue_size=8):
+        self.path = path
+        self.decimation = max(1, int(decimation))
+        self.fps = fps / self.decimation
+        self.codec = codec
+        self.size = tuple(size) if size else None
+        self.queue_size = max(1, queue_size)
+        self.frames = queue.Queue()
+        self.free_buffers = queue.Queue()
+        self.buffers_allocated = 0
+        self.writer = None
+        self.thread = None
+        self.running = False
+        self.frames_seen = 0
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_decimated = 0
+        self.encode_time = 0.0
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._encode_loop, name="session-recorder", daemon=True)
+        self.thread.start()
+    def _acquire_buffer(self, shape):
+        try:
+            buffer = self.free_buffers.get_nowait()
+            if buffer.shape == shape:
+                return buffer
+        except queue.Empty:
+            if self.buffers_allocated >= self.queue_size:
+                return None
+            self.buffers_allocated += 1
+        return np.empty(shape, dtype=np.uint8)
+    def submit(self, frame):
+        if not self.running:
+            return False
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.decimation:
+            self.frames_decimated += 1
+            return False
+        width, height = self.size if self.size else (frame.shape[1], frame.shape[0])
+        buffer = self._acquire_buffer((height, width, 3))
+        if buffer is None:
+            with self.lock:
+                self.frames_dropped += 1
+            return False
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, (width, height), dst=buffer, interpolation=cv2.INTER_AREA)
+        self.frames.put(buffer)
+        self.frames_submitted += 1
+        return True
+    def _encode_loop(self):
+        while True:
+            buffer = self.frames.get()
+            if buffer is None:
+                break
+            start_time = time.perf_counter()
+            try:
+                if self.writer is None:
+                    self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (buffer.shape[1], buffer.shape[0]))
+                    if not self.writer.isOpened():
+                        print(f"Failed to open session recording {self.path} with codec {self.codec}")
+                self.writer.write(buffer)
+                self.frames_written += 1
+            except Exception as e:
+                print(f"Error encoding session frame: {e}")
+            self.encode_time += time.perf_counter() - start_time
+            self.free_buffers.put(buffer)
+    def close(self):
+        if not self.running:
+            return
+        self.running = False
+        self.frames.put(None)
+        self.thread.join()
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        print(f"Session recording: {self.frames_written} frames written to {self.path}, {self.frames_dropped} dropped")
+    def get_stats(self):
+        return {
+            "frames_submitted": self.frames_submitted,
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "frames_decimated": self.frames_decimated,
+            "queue_depth": self.frames.qsize(),
+            "avg_encode_ms": self.encode_time / self.frames_written * 1000 if self.frames_written else 0,
+            "output_fps": self.fps
+        }
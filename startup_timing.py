@@ -0,0 +1,35 @@
+import time
+class StartupTimer:
+    def __init__(self, start_time=None):
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.marks = []
+        self.durations = []
+        self.reported = False
+    def mark(self, name, timestamp=None):
+        timestamp = timestamp if timestamp is not None else time.perf_counter()
+        self.marks.append((name, timestamp - self.start_time))
+    def add_duration(self, name, duration):
+        self.durations.append((name, duration))
+    def get_mark(self, name):
+        for mark_name, elapsed in self.marks:
+            if mark_name == name:
+                return elapsed
+        return None
+    def get_report(self):
+        report = {"marks": {}, "phases": {}, "durations": {}}
+        previous = 0
+        for name, elapsed in sorted(self.marks, key=lambda mark: mark[1]):
+            report["marks"][name] = elapsed * 1000
+            report["phases"][name] = (elapsed - previous) * 1000
+            previous = elapsed
+        for name, duration in self.durations:
+            report["durations"][name] = duration * 1000
+        return report
+    def print_report(self):
+        report = self.get_report()
+        print("Startup timing:")
+        for name, elapsed in report["marks"].items():
+            print(f"  {name:<24}{report['phases'][name]:>10.1f} ms  (at {elapsed:.1f} ms)")
+        for name, duration in report["durations"].items():
+            print(f"  {name:<24}{duration:>10.1f} ms  (background)")
+        self.reported = True
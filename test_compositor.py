@@ -0,0 +1,25 @@
+import cv2
+import numpy as np
+from canvas_engine import CanvasEngine
+from compositor import FrameCompositor
+def test_compose_matches_full_frame_blend():
+    canvas = CanvasEngine(320, 240)
+    canvas.draw((50, 50), is_drawing=True)
+    canvas.draw((200, 120), is_drawing=True)
+    frame = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    compositor = FrameCompositor()
+    output = compositor.compose(frame, canvas)
+    assert np.array_equal(output, cv2.addWeighted(frame, 0.5, canvas.get_layer(), 0.5, 0))
+    assert 0 < compositor.last_blend_fraction < 1
+def test_compose_follows_canvas_changes():
+    canvas = CanvasEngine(320, 240)
+    frame = np.full((240, 320, 3), 40, dtype=np.uint8)
+    compositor = FrameCompositor(buffers=1)
+    compositor.compose(frame, canvas)
+    assert compositor.last_blend_fraction == 0
+    canvas.draw((100, 100), is_drawing=True)
+    output = compositor.compose(frame, canvas)
+    assert np.array_equal(output, cv2.addWeighted(frame, 0.5, canvas.get_layer(), 0.5, 0))
+    canvas.clear()
+    output = compositor.compose(frame, canvas)
+    assert np.array_equal(output, cv2.addWeighted(frame, 0.5, canvas.get_layer(), 0.5, 0))
@@ -0,0 +1,10 @@
+import numpy as np
+import pytest
+pytest.importorskip("mediapipe")
+from hand_tracking import remap_roi_landmarks
+def test_remap_roi_landmarks_to_frame():
+    landmarks = np.array([[[0.0, 0.0, 0.1], [1.0, 1.0, -0.2], [0.5, 0.25, 0.0]]], dtype=np.float32)
+    remap_roi_landmarks(landmarks, (100, 50, 300, 250), 640, 480)
+    assert np.allclose(landmarks[0, 0], [100 / 640, 50 / 480, 0.1 * 200 / 640])
+    assert np.allclose(landmarks[0, 1], [300 / 640, 250 / 480, -0.2 * 200 / 640])
+    assert np.allclose(landmarks[0, 2], [200 / 640, 100 / 480, 0.0])
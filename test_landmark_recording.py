@@ -0,0 +1,27 @@
+import numpy as np
+from landmark_recording import LandmarkRecorder, LandmarkSessionReader
+def test_record_read_round_trip(tmp_path):
+    path = str(tmp_path / "session.galm")
+    rng = np.random.default_rng(7)
+    frames = [rng.random((2, 21, 3)).astype(np.float32) * [1280, 720, 1] for _ in range(3)]
+    recorder = LandmarkRecorder(path, max_hands=2, frame_size=(1280, 720))
+    recorder.record_frame(0.0, frames[0], ["Right", "Left"])
+    recorder.record_frame(0.033, frames[1][:1], ["Left"], predicted=True)
+    recorder.record_frame(0.066, [])
+    recorder.close()
+    reader = LandmarkSessionReader(path)
+    assert len(reader) == 3
+    assert reader.frame_size == (1280, 720)
+    timestamp, hands, handedness, predicted = reader.get_frame(0)
+    assert timestamp == 0.0 and not predicted
+    assert hands.shape == (2, 21, 4) and hands.dtype == np.float32
+    assert np.array_equal(hands[0, :, 0], np.arange(21))
+    assert np.array_equal(hands[..., 1:], frames[0].astype(np.float32))
+    assert handedness == ["Right", "Left"]
+    timestamp, hands, handedness, predicted = reader.get_frame(1)
+    assert predicted and hands.shape == (1, 21, 4) and handedness == ["Left"]
+    assert np.array_equal(hands[0, :, 1:], frames[1][0].astype(np.float32))
+    timestamp, hands, handedness, predicted = reader.get_frame(2)
+    assert hands.shape == (0, 21, 4) and handedness == []
+    assert reader.index_for_time(0.05) == 2
+    reader.close()
@@ -0,0 +1,55 @@
+import numpy as np
+from clock import SimulatedClock
+from optimizations import InferenceScheduler, LatencyHistogram
+def test_window_after_reset_wraps_ring():
+    histogram = LatencyHistogram(window=120)
+    for _ in range(118):
+        histogram.record(0.01)
+    histogram.reset_window()
+    for i in range(5):
+        histogram.record(0.02 + i * 0.001)
+    window = histogram.get_window()
+    assert len(window) == 5
+    assert np.allclose(window, [0.02, 0.021, 0.022, 0.023, 0.024])
+    assert abs(histogram.window_mean() - 0.022) < 1e-9
+    summary = histogram.get_summary()
+    assert abs(summary["max"] - 24.0) < 1e-6
+def test_running_window_mean_matches_samples():
+    histogram = LatencyHistogram(window=16)
+    rng = np.random.default_rng(3)
+    values = rng.random(100) * 0.05
+    for i, value in enumerate(values):
+        histogram.record(value)
+        if i == 40:
+            histogram.reset_window()
+            assert histogram.window_mean() == 0.0 and len(histogram.get_window()) == 0
+            continue
+        expected = values[max(41 if i > 40 else 0, i - 15):i + 1]
+        assert abs(histogram.window_mean() - expected.mean()) < 1e-9
+        assert np.allclose(np.sort(histogram.get_window()), np.sort(expected))
+def test_scheduler_predicts_between_inferences():
+    clock = SimulatedClock()
+    scheduler = InferenceScheduler(interval=3, error_threshold=1000.0, clock=clock)
+    landmarks = np.zeros((21, 4), dtype=np.float32)
+    landmarks[:, 0] = np.arange(21)
+    landmarks[:, 1:3] = 100
+    cadence = []
+    for _ in range(9):
+        clock.advance(1 / 30)
+        if scheduler.should_infer():
+            scheduler.observe(landmarks)
+            cadence.append("infer")
+        else:
+            predicted = scheduler.predict()
+            assert predicted.predicted and predicted.shape == (21, 4)
+            cadence.append("predict")
+    assert cadence == ["infer", "predict", "predict"] * 3
+def test_scheduler_forces_inference_after_losing_hand():
+    scheduler = InferenceScheduler(interval=5, clock=SimulatedClock())
+    landmarks = np.zeros((21, 4), dtype=np.float32)
+    scheduler.observe(landmarks)
+    scheduler.observe(landmarks)
+    assert not scheduler.should_infer()
+    scheduler.observe([])
+    assert scheduler.should_infer()
+    assert len(scheduler.predict()) == 0
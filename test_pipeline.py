@@ -0,0 +1,55 @@
+import threading
+import pytest
+from pipeline import StageQueue, FramePipeline, DROP_OLDEST, DROP_NEWEST, BLOCK
+def test_drop_oldest_keeps_newest_items():
+    stage = StageQueue(2, DROP_OLDEST)
+    for i in range(5):
+        assert stage.put(i)
+    assert stage.dropped == 3
+    assert [stage.get(timeout=0.1), stage.get(timeout=0.1)] == [3, 4]
+    assert stage.get(timeout=0.01) is None
+def test_drop_newest_rejects_when_full():
+    stage = StageQueue(2, DROP_NEWEST)
+    assert stage.put(0) and stage.put(1)
+    assert not stage.put(2)
+    assert stage.dropped == 1
+    assert [stage.get(timeout=0.1), stage.get(timeout=0.1)] == [0, 1]
+def test_block_gives_up_when_stopped():
+    stage = StageQueue(1, BLOCK)
+    stop_event = threading.Event()
+    assert stage.put(0, stop_event)
+    stop_event.set()
+    assert not stage.put(1, stop_event)
+    assert stage.dropped == 0 and stage.qsize() == 1
+def test_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        StageQueue(2, "drop_random")
+def _run(pipeline):
+    pipeline.start()
+    packets = []
+    try:
+        while not pipeline.is_finished():
+            packet = pipeline.get(timeout=0.05)
+            if packet is not None:
+                packets.append(packet)
+        pipeline.raise_error()
+    finally:
+        pipeline.stop()
+    return packets
+def test_pipeline_delivers_every_frame_in_order():
+    frames = iter(range(20))
+    def capture():
+        frame = next(frames, None)
+        return frame is not None, frame
+    pipeline = FramePipeline(capture, lambda frame, timestamp: (frame, [frame]), drop_policy=BLOCK)
+    packets = _run(pipeline)
+    assert [packet.seq for packet in packets] == list(range(20))
+    assert [packet.landmarks for packet in packets] == [[i] for i in range(20)]
+def test_pipeline_reraises_stage_errors():
+    def capture():
+        return True, 0
+    def infer(frame, timestamp):
+        raise ValueError("bad frame")
+    pipeline = FramePipeline(capture, infer, drop_policy=BLOCK)
+    with pytest.raises(ValueError, match="bad frame"):
+        _run(pipeline)
@@ -1,19 +1,27 @@
+import argparse
 import cv2
 import numpy as np
 import sys
+import time
+from machine_profile import DEFAULT_PROFILE_PATH, save_profile
+CAMERA_RESOLUTIONS = [(640, 480), (960, 540), (1280, 720), (1920, 1080)]
+INFERENCE_SIZES = [(256, 144), (320, 240), (480, 270), (640, 360), (640, 480), (960, 540)]
 def check():
     print("running system check for gestureart...")
     print("-" * 50)
     try:
         import mediapipe
-        import tensorflow
         print("opencv version:", cv2.__version__)
         print("mediapipe version:", mediapipe.__version__)
         print("numpy version:", np.__version__)
-        print("tensorflow version:", tensorflow.__version__)
     except Exception as error:
         print("problem with required libraries:", error)
         return False
+    try:
+        import tensorflow
+        print("tensorflow version:", tensorflow.__version__)
+    except Exception:
+        print("tensorflow not installed (style transfer disabled)")
     try:
         camera = cv2.VideoCapture(0)
         success, frame = camera.read()
@@ -26,7 +34,119 @@ def check():
         return False
     print("✓ everything looks good")
     return True
+def measure_camera(camera_id=0, resolutions=CAMERA_RESOLUTIONS, duration=2.0):
+    results = []
+    for width, height in resolutions:
+        camera = cv2.VideoCapture(camera_id)
+        camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        entry = {"width": width, "height": height, "supported": False, "fps": 0.0}
+        if camera.isOpened():
+            actual = (int(camera.get(cv2.CAP_PROP_FRAME_WIDTH)), int(camera.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            for _ in range(5):
+                camera.read()
+            frames = 0
+            start_time = time.perf_counter()
+            while time.perf_counter() - start_time < duration:
+                success, frame = camera.read()
+                if not success:
+                    break
+                frames += 1
+            elapsed = time.perf_counter() - start_time
+            entry["supported"] = frames > 0 and actual == (width, height)
+            entry["fps"] = frames / elapsed if elapsed > 0 else 0.0
+            entry["actual"] = list(actual)
+        camera.release()
+        print(f"camera {width}x{height}: {'ok' if entry['supported'] else 'unsupported'}, {entry['fps']:.1f} fps")
+        results.append(entry)
+    return results
+def measure_inference(sizes=INFERENCE_SIZES, runs=30, frame=None):
+    from hand_tracking import HandTracker
+    results = []
+    source = frame if frame is not None else np.full((1080, 1920, 3), 96, dtype=np.uint8)
+    for width, height in sizes:
+        tracker = HandTracker(inference_size=(width, height))
+        image = cv2.resize(source, (width, height))
+        tracker.find_hands(image, draw=False)
+        times = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            tracker.find_hands(image, draw=False)
+            times.append((time.perf_counter() - start_time) * 1000)
+        entry = {
+            "width": width,
+            "height": height,
+            "avg_ms": float(np.mean(times)),
+            "p95_ms": float(np.percentile(times, 95))
+        }
+        print(f"inference {width}x{height}: {entry['avg_ms']:.1f} ms avg, {entry['p95_ms']:.1f} ms p95")
+        results.append(entry)
+    return results
+def measure_brushes(width=1280, height=720, dabs=300, brush_size=10):
+    from canvas_engine import CanvasEngine, BrushType
+    results = {}
+    for brush in BrushType:
+        canvas = CanvasEngine(width, height)
+        canvas.brush_type = brush
+        canvas.brush_size = brush_size
+        points = [(int(100 + i * (width - 200) / dabs), int(height / 2 + 100 * np.sin(i / 20))) for i in range(dabs)]
+        start_time = time.perf_counter()
+        for point in points:
+            canvas.draw(point, is_drawing=True)
+        elapsed = time.perf_counter() - start_time
+        canvas.draw(None)
+        results[brush.name] = {"dabs_per_sec": dabs / elapsed if elapsed > 0 else 0.0, "us_per_dab": elapsed / dabs * 1e6}
+        print(f"brush {brush.name.lower()}: {results[brush.name]['dabs_per_sec']:.0f} dabs/s")
+    return results
+def measure_ui(width=1280, height=720, runs=50):
+    from ui import UIManager
+    ui = UIManager(width, height)
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    ui.render(frame)
+    times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        ui.render(frame)
+        times.append((time.perf_counter() - start_time) * 1000)
+    result = {"avg_ms": float(np.mean(times)), "p95_ms": float(np.percentile(times, 95))}
+    print(f"ui render: {result['avg_ms']:.1f} ms avg, {result['p95_ms']:.1f} ms p95")
+    return result
+def run_diagnostics(camera_id=0, output=DEFAULT_PROFILE_PATH, skip_camera=False, camera_duration=2.0, target_fps=30.0):
+    print("running hardware diagnostics for gestureart...")
+    print("-" * 50)
+    results = {}
+    frame = None
+    if not skip_camera:
+        results["camera"] = measure_camera(camera_id, duration=camera_duration)
+        camera = cv2.VideoCapture(camera_id)
+        success, captured = camera.read()
+        camera.release()
+        frame = captured if success else None
+    results["inference"] = measure_inference(frame=frame)
+    results["brushes"] = measure_brushes()
+    results["ui"] = measure_ui()
+    profile = save_profile(results, output, target_fps)
+    print("-" * 50)
+    settings = profile["settings"]
+    print("recommended settings:")
+    print("  capture size:", "x".join(str(v) for v in settings["capture_size"]) if settings["capture_size"] else "default")
+    print("  inference size:", "x".join(str(v) for v in settings["inference_size"]) if settings["inference_size"] else "default")
+    print("  pipeline mode:", settings["pipeline"])
+    print("machine profile written to", output)
+    return profile
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GestureArt system check and hardware diagnostics")
+    parser.add_argument("--diagnostics", action="store_true", help="Measure this machine and write a machine profile")
+    parser.add_argument("--camera", type=int, default=0, help="Camera device ID to measure")
+    parser.add_argument("--output", default=DEFAULT_PROFILE_PATH, help="Machine profile path")
+    parser.add_argument("--skip-camera", action="store_true", help="Skip camera measurements")
+    parser.add_argument("--camera-duration", type=float, default=2.0, help="Seconds to sample each camera resolution")
+    parser.add_argument("--target-fps", type=float, default=30.0, help="Frame rate the recommendations aim for")
+    args = parser.parse_args()
+    if args.diagnostics:
+        run_diagnostics(args.camera, args.output, args.skip_camera, args.camera_duration, args.target_fps)
+        sys.exit(0)
     passed = check()
     print("-" * 50)
     if passed:
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+_local = threading.local()
+class _NullSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+NULL_SPAN = _NullSpan()
+class Span:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+        self.start = 0
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.trace.add_span(self.name, self.start, time.perf_counter())
+        return False
+class FrameTrace:
+    def __init__(self, frame_id):
+        self.frame_id = frame_id
+        self.start = time.perf_counter()
+        self.end = None
+        self.spans = []
+    def add_span(self, name, start, end):
+        self.spans.append((name, start, end, threading.get_ident()))
+    def get_duration(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+def current_trace():
+    return getattr(_local, "trace", None)
+def set_current_trace(trace):
+    _local.trace = trace
+def trace_span(name):
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name)
+def add_span(name, start, end):
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.add_span(name, start, end)
+class Tracer:
+    def __init__(self, flight_seconds=10.0, slow_frame_ms=None, output_dir="output/traces", dump_cooldown=2.0):
+        self.flight_seconds = flight_seconds
+        self.slow_frame_ms = slow_frame_ms
+        self.output_dir = output_dir
+        self.dump_cooldown = dump_cooldown
+        self.traces = deque()
+        self.lock = threading.Lock()
+        self.thread_names = {}
+        self.pid = os.getpid()
+        self.frames_traced = 0
+        self.slow_frames = 0
+        self.dumps_written = 0
+        self.last_dump_time = None
+        self.worst_frame_ms = 0
+    def begin_frame(self, frame_id):
+        trace = FrameTrace(frame_id)
+        self.attach(trace)
+        return trace
+    def attach(self, trace):
+        thread = threading.current_thread()
+        self.thread_names[thread.ident] = thread.name
+        set_current_trace(trace)
+    def end_frame(self, trace=None):
+        trace = trace if trace is not None else current_trace()
+        set_current_trace(None)
+        if trace is None:
+            return None
+        trace.end = time.perf_counter()
+        with self.lock:
+            self.traces.append(trace)
+            while self.traces and self.traces[0].end < trace.end - self.flight_seconds:
+                self.traces.popleft()
+        self.frames_traced += 1
+        frame_ms = trace.get_duration() * 1000
+        self.worst_frame_ms = max(self.worst_frame_ms, frame_ms)
+        if self.slow_frame_ms is not None and frame_ms > self.slow_frame_ms:
+            self.slow_frames += 1
+            if self.last_dump_time is None or trace.end - self.last_dump_time >= self.dump_cooldown:
+                self.last_dump_time = trace.end
+                path = self.dump_flight_recording(f"slow_frame_{trace.frame_id}")
+                print(f"Slow frame {trace.frame_id}: {frame_ms:.1f} ms, trace written to {path}")
+        return trace
+    def get_traces(self):
+        with self.lock:
+            return list(self.traces)
+    def to_chrome_events(self, traces=None):
+        traces = traces if traces is not None else self.get_traces()
+        events = []
+        for tid, name in self.thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}})
+        for trace in traces:
+            end = trace.end if trace.end is not None else trace.start
+            events.append({
+                "name": f"frame {trace.frame_id}",
+                "cat": "frame",
+                "ph": "X",
+                "ts": trace.start * 1e6,
+                "dur": (end - trace.start) * 1e6,
+                "pid": self.pid,
+                "tid": 0,
+                "args": {"frame": trace.frame_id}
+            })
+            for name, start, span_end, tid in trace.spans:
+                events.append({
+                    "name": name,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": (span_end - start) * 1e6,
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"frame": trace.frame_id}
+                })
+        return events
+    def dump(self, path, traces=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.to_chrome_events(traces), "displayTimeUnit": "ms"}, f)
+        self.dumps_written += 1
+        return path
+    def dump_flight_recording(self, reason="manual"):
+        filename = f"trace_{time.strftime('%Y%m%d_%H%M%S')}_{reason}.json"
+        return self.dump(os.path.join(self.output_dir, filename))
+    def get_stats(self):
+        return {
+            "frames_traced": self.frames_traced,
+            "frames_buffered": len(self.traces),
+            "slow_frames": self.slow_frames,
+            "worst_frame_ms": self.worst_frame_ms,
+            "dumps_written": self.dumps_written
+        }
@@ -1,7 +1,8 @@
 import cv2
 import numpy as np
-import time
 from enum import Enum
+from clock import get_clock
+from instrumentation import get_registry, timed
 class UIElement(Enum):
     HEADER = 0
     COLOR_PICKER = 1
@@ -9,7 +10,8 @@ class UIElement(Enum):
     HELP = 3
     SETTINGS = 4
 class UIManager:
-    def __init__(self, width=1280, height=720):
+    def __init__(self, width=1280, height=720, clock=None):
+        self.clock = get_clock(clock)
         self.width = width
         self.height = height
         self.elements = {
@@ -123,15 +125,21 @@ class UIManager:
         }
         self.hover_element = None
         self.active_element = None
-        self.last_interaction_time = time.time()
+        self.last_interaction_time = self.clock.time()
         self.auto_hide_delay = 3.0 
-        self.last_render_time = 0
-        self.render_count = 0
-        self.avg_render_time = 0
-    def render(self, frame, landmarks=None, gesture_info=None):
-        start_time = time.time()
-        result = frame.copy()
-        current_time = time.time()
+        self.render_interval = 1
+        self.frames_since_render = 0
+        self.cached_regions = []
+    @timed("ui.render")
+    def render(self, frame, landmarks=None, gesture_info=None, in_place=False):
+        result = frame if in_place else frame.copy()
+        if self.render_interval > 1 and self.cached_regions and self.frames_since_render < self.render_interval - 1:
+            self.frames_since_render += 1
+            for (x, y, w, h), pixels in self.cached_regions:
+                result[y:y + h, x:x + w] = pixels
+            return result
+        self.frames_since_render = 0
+        current_time = self.clock.time()
         if current_time - self.last_interaction_time > self.auto_hide_delay:
             self.elements[UIElement.COLOR_PICKER]["visible"] = False
             self.elements[UIElement.BRUSH_SELECTOR]["visible"] = False
@@ -274,7 +282,7 @@ class UIManager:
                          (rect[0] + rect[2], rect[1] + rect[3]), 
                          (100, 100, 100), 2)
             alpha = 0.8
-            result = cv2.addWeighted(overlay, alpha, result, 1 - alpha, 0)
+            cv2.addWeighted(overlay, alpha, result, 1 - alpha, 0, dst=result)
             line_height = 25
             for i, line in enumerate(help_element["content"]):
                 if i == 0:
@@ -294,7 +302,7 @@ class UIManager:
                          (rect[0] + rect[2], rect[1] + rect[3]), 
                          (100, 100, 100), 2)
             alpha = 0.8
-            result = cv2.addWeighted(overlay, alpha, result, 1 - alpha, 0)
+            cv2.addWeighted(overlay, alpha, result, 1 - alpha, 0, dst=result)
             cv2.putText(result, "Settings", (rect[0] + 20, rect[1] + 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 1, cv2.LINE_AA)
             for setting in settings_element["settings"]:
@@ -357,14 +365,30 @@ class UIManager:
                          (100, 100, 100), 1)
             cv2.putText(result, self.status_bar["text"], (rect[0] + 10, rect[1] + 20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
-        if landmarks:
+        if landmarks is not None and len(landmarks) > 0:
             self._highlight_interactive_elements(result, landmarks)
-        end_time = time.time()
-        self.last_render_time = end_time - start_time
-        self.render_count += 1
-        self.avg_render_time = ((self.render_count - 1) * self.avg_render_time + self.last_render_time) / self.render_count
+        if self.render_interval > 1:
+            self._cache_regions(result, gesture_info is not None)
+        else:
+            self.cached_regions = []
         return result
     
+    def _cache_regions(self, result, gesture_shown):
+        rects = [element["rect"] for element in self.elements.values() if element["visible"]]
+        if self.gesture_indicator["visible"] and gesture_shown:
+            rects.append(self.gesture_indicator["rect"])
+        if self.status_bar["visible"]:
+            rects.append(self.status_bar["rect"])
+        self.cached_regions = []
+        frame_h, frame_w = result.shape[:2]
+        for x, y, w, h in rects:
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(frame_w, x + w + 1), min(frame_h, y + h + 1)
+            if x0 < x1 and y0 < y1:
+                self.cached_regions.append(((x0, y0, x1 - x0, y1 - y0), result[y0:y1, x0:x1].copy()))
+    def set_render_interval(self, interval):
+        self.render_interval = max(1, int(interval))
+        self.frames_since_render = 0
     def _highlight_interactive_elements(self, frame, landmarks):
         index_tip = None
         for lm in landmarks:
@@ -407,7 +431,7 @@ class UIManager:
     def handle_interaction(self, point, is_selecting=False):
         if point is None:
             return {"type": "none"}
-        self.last_interaction_time = time.time()
+        self.last_interaction_time = self.clock.time()
         if self.elements[UIElement.HEADER]["visible"]:
             for button in self.elements[UIElement.HEADER]["buttons"]:
                 if self._is_point_in_rect(point, button["rect"]):
@@ -533,10 +557,11 @@ class UIManager:
     def get_current_color(self):
         return self.elements[UIElement.COLOR_PICKER]["current_color"]
     def get_performance_metrics(self):
+        stats = get_registry().get_span_stats("ui.render")
         return {
-            "last_render_time": self.last_render_time * 1000,
-            "avg_render_time": self.avg_render_time * 1000,  
-            "render_count": self.render_count
+            "last_render_time": stats["last"],
+            "avg_render_time": stats["avg"],
+            "render_count": stats["count"]
         }
 if __name__ == "__main__":
     cv2.namedWindow("UI Test", cv2.WINDOW_NORMAL)